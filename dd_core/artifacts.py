@@ -0,0 +1,91 @@
+import glob
+import json
+import os
+import pickle
+import threading
+import time
+
+from cachetools import LRUCache
+
+from dd_core.paths import cache_path
+
+# Results published by scripts/precompute.py and read by the pages. Every
+# version of an artifact is an immutable file under .cache/artifacts/<name>/,
+# and a small `current.json` pointer names the one to serve. Both are written
+# to a temporary file and renamed into place, so a reader sees either the old or
+# the new version, never a partial one.
+KEEP_VERSIONS = 3
+
+# Unpickled artifacts, keyed by their (immutable) file
+_loaded = LRUCache(maxsize=64)
+_lock = threading.Lock()
+
+
+def _pointer_path(name):
+    return cache_path('artifacts', name, 'current.json')
+
+
+def _artifact_path(name, version):
+    return cache_path('artifacts', name, f'{version}.pkl')
+
+
+def _replace(path, write, mode='w'):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, mode) as file:
+        write(file)
+    os.replace(tmp_path, path)
+
+
+def current(name):
+    # Pointer to the published version: {'version', 'file', 'published', 'seconds'}
+    try:
+        with open(_pointer_path(name)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def publish(name, version, value, seconds=None):
+    path = _artifact_path(name, version)
+    _replace(path, lambda file: pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL), mode='wb')
+    pointer = {'version': version, 'file': os.path.basename(path), 'published': time.time(), 'seconds': seconds}
+    _replace(_pointer_path(name), lambda file: json.dump(pointer, file))
+    _prune(name)
+    return path
+
+
+def _prune(name):
+    # Keep a few older versions for readers that resolved the pointer just before it moved
+    files = sorted(glob.glob(cache_path('artifacts', name, '*.pkl')), key=os.path.getmtime, reverse=True)
+    for path in files[KEEP_VERSIONS:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load(name, version):
+    # The published value of the artifact if it was computed from `version` of its inputs, else None
+    published = latest(name)
+    if published is None or published[0] != version:
+        return None
+    return published[1]
+
+
+def latest(name):
+    # (version, value) of the published artifact, whatever inputs it was computed from, or None
+    pointer = current(name)
+    if pointer is None:
+        return None
+    path = cache_path('artifacts', name, pointer['file'])
+    with _lock:
+        if path in _loaded:
+            return pointer['version'], _loaded[path]
+    try:
+        with open(path, 'rb') as file:
+            value = pickle.load(file)
+    except OSError:
+        return None
+    with _lock:
+        _loaded[path] = value
+    return pointer['version'], value
@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from dd_core import tracing
+from dd_core.models import series_fingerprint
+from dd_core.paths import cache_path
+
+# Rolling-origin (expanding window) backtests of the ARIMA forecasts. For every
+# origin the model is fitted on the months up to it and forecasts the next
+# `horizon` months, which are compared with what was observed. The origins of a
+# series are split into contiguous blocks fitted in a process pool; within a
+# block each fit starts from the parameters of the previous origin, which only
+# lacks one month, so the optimiser converges in a few steps. Results are cached
+# per (series fingerprint, order, horizon, minimum training length), in memory
+# and as pickles under .cache/backtests, so a rerun on unchanged data only reads
+# them back.
+HORIZON = 12
+# Months of the first training window; shorter series are not backtested
+MIN_TRAIN = 24
+# Fewest origins per block, so the cold fit starting each block stays a small share
+MIN_BLOCK = 8
+
+_memory = LRUCache(maxsize=64)
+_lock = threading.Lock()
+
+
+def origins(length, min_train=MIN_TRAIN):
+    # Training lengths of the expanding windows; the last origin leaves one month to forecast
+    return list(range(min_train, length))
+
+
+def _order_tag(order):
+    return '-'.join(str(part) for part in order)
+
+
+def _backtest_file(fingerprint, order, horizon, min_train):
+    return cache_path('backtests', f'{fingerprint[:16]}__{_order_tag(order)}__h{horizon}__t{min_train}.pkl')
+
+
+def backtest_block(series, order, horizon, ends):
+    # Forecast errors of the origins `ends` (training lengths, ascending): one row
+    # per origin and step, with NaN actuals past the end of the series
+    import statsmodels.api as sm
+
+    rows = []
+    params = None
+    with warnings.catch_warnings():
+        # Convergence warnings of single origins are expected; their errors show in the metrics
+        warnings.simplefilter('ignore')
+        for end in ends:
+            model = sm.tsa.ARIMA(series.iloc[:end], order=order)
+            try:
+                results = model.fit(start_params=params)
+            except (ValueError, ArithmeticError, np.linalg.LinAlgError):
+                continue
+            params = results.params
+            forecast = results.forecast(steps=horizon).to_numpy()
+            actual = series.iloc[end:end + horizon].to_numpy()
+            actual = np.concatenate([actual, np.full(horizon - len(actual), np.nan)])
+            rows.append(pd.DataFrame({
+                'origin': series.index[end - 1],
+                'step': np.arange(1, horizon + 1),
+                'forecast': forecast,
+                'actual': actual,
+            }))
+    if not rows:
+        return pd.DataFrame(columns=['origin', 'step', 'forecast', 'actual'])
+    return pd.concat(rows, ignore_index=True)
+
+
+def _block_task(args):
+    task_key, series, order, horizon, ends = args
+    return task_key, backtest_block(series, order, horizon, ends)
+
+
+def _blocks(ends, workers):
+    count = max(1, min(workers, len(ends) // MIN_BLOCK))
+    return [list(block) for block in np.array_split(ends, count) if len(block)]
+
+
+def _load(path):
+    try:
+        return pd.read_pickle(path)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def _save(path, table):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    table.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def backtest_many(series, orders=((1, 1, 1),), horizon=HORIZON, min_train=MIN_TRAIN, workers=None):
+    # Forecast errors of every series of {key: series} (see forecasts.collect_series)
+    # and order: a tidy table with the key as 'dataset' and 'series', the order,
+    # the origin, the step and the forecast and actual values. Series shorter
+    # than min_train + 1 months are left out.
+    workers = workers or os.cpu_count() or 1
+    tables, todo = {}, {}
+    for key, values in series.items():
+        if len(values) <= min_train:
+            continue
+        fingerprint = series_fingerprint(values)
+        for order in orders:
+            order = tuple(order)
+            cache_key = (fingerprint, order, horizon, min_train)
+            with _lock:
+                table = _memory.get(cache_key)
+            if table is None:
+                path = _backtest_file(*cache_key)
+                table = _load(path) if os.path.exists(path) else None
+            if table is None:
+                todo[(key, order)] = (cache_key, values)
+            else:
+                tables[(key, order)] = table
+                with _lock:
+                    _memory[cache_key] = table
+
+    with tracing.span('model/backtest', rows=len(todo)) as span:
+        span.cache = 'miss' if todo else 'hit'
+        tasks = [(task_key, values, task_key[1], horizon, ends) for task_key, (_, values) in todo.items()
+                 for ends in _blocks(origins(len(values), min_train), workers)]
+        if workers == 1 or len(tasks) < 2:
+            done = [_block_task(task) for task in tasks]
+        else:
+            # spawn, as in forecasts.forecast_many: this can run in a thread of the Streamlit server
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+                done = list(pool.map(_block_task, tasks))
+
+    blocks = {}
+    for task_key, table in done:
+        blocks.setdefault(task_key, []).append(table)
+    for task_key, (cache_key, _) in todo.items():
+        table = pd.concat(blocks[task_key], ignore_index=True)
+        _save(_backtest_file(*cache_key), table)
+        with _lock:
+            _memory[cache_key] = table
+        tables[task_key] = table
+
+    columns = ['dataset', 'series', 'order', 'origin', 'step', 'forecast', 'actual']
+    frames = [table.assign(dataset=key[0], series=key[1], order=[order] * len(table))
+              for (key, order), table in tables.items()]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def accuracy(errors):
+    # MAE and MAPE (%) per series, order and forecast step, over the origins whose
+    # step was observed; MAPE leaves out months with an actual value of 0
+    observed = errors.dropna(subset=['actual']).assign(order=lambda df: df['order'].astype(str))
+    absolute = (observed['forecast'] - observed['actual']).abs()
+    observed = observed.assign(
+        absolute_error=absolute,
+        percentage_error=(absolute / observed['actual'].abs().replace(0, np.nan)) * 100,
+    )
+    return (observed.groupby(['dataset', 'series', 'order', 'step'], sort=False)
+            .agg(origins=('absolute_error', 'size'), mae=('absolute_error', 'mean'),
+                 mape=('percentage_error', 'mean'))
+            .reset_index())
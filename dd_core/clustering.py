@@ -0,0 +1,163 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from dd_core import datasets, tracing
+from dd_core.paths import cache_path
+
+# Clustering of the geographies of the m3 dataset by their attainment figures.
+# Each geography is one row of (year x attainment level) features, standardized.
+# Up to MINIBATCH_THRESHOLD rows plain KMeans is used, above it MiniBatchKMeans,
+# so census-division sized inputs stay fast. Without a fixed k, the number of
+# clusters is the candidate with the best silhouette score; the candidates are
+# fitted in a process pool when the input is large. Results are cached by the
+# hash of the feature matrix, in memory and as JSON under .cache/clusters.
+MINIBATCH_THRESHOLD = 10_000
+K_CANDIDATES = range(2, 9)
+# Silhouette scores are estimated on a sample of at most this many rows
+SILHOUETTE_SAMPLE = 5_000
+RANDOM_STATE = 42
+
+_memory = LRUCache(maxsize=16)
+_lock = threading.Lock()
+
+
+def feature_matrix(df):
+    # Pivot the data to have states as rows and year x attainment level as columns
+    pivot_data = df.pivot(index='Geography', columns='Educational attainment level')
+
+    # Flatten the multi-level column index for simplicity
+    pivot_data.columns = ['_'.join(col).strip() for col in pivot_data.columns.values]
+
+    # Select only the columns containing years (assuming year columns have numeric names)
+    year_columns = [col for col in pivot_data.columns if col.split('_')[0].isdigit()]
+    return pivot_data[year_columns].astype('float64')
+
+
+def _kmeans(k, rows):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if rows > MINIBATCH_THRESHOLD:
+        return MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=RANDOM_STATE)
+    return KMeans(n_clusters=k, n_init=10, random_state=RANDOM_STATE)
+
+
+def _score_k(X, k):
+    from sklearn.metrics import silhouette_score
+
+    model = _kmeans(k, len(X))
+    labels = model.fit_predict(X)
+    sample_size = SILHOUETTE_SAMPLE if len(X) > SILHOUETTE_SAMPLE else None
+    silhouette = silhouette_score(X, labels, sample_size=sample_size, random_state=RANDOM_STATE)
+    return {'k': k, 'inertia': float(model.inertia_), 'silhouette': float(silhouette)}
+
+
+def _elbow(selection):
+    # The "knee" of the inertia curve: the candidate furthest below the straight
+    # line from the first to the last candidate, both axes scaled to [0, 1]
+    k = selection['k'].to_numpy(dtype='float64')
+    inertia = selection['inertia'].to_numpy(dtype='float64')
+    if len(k) < 3 or inertia[0] == inertia[-1]:
+        return int(k[0])
+    x = (k - k[0]) / (k[-1] - k[0])
+    y = (inertia - inertia[-1]) / (inertia[0] - inertia[-1])
+    return int(k[np.argmax(1 - x - y)])
+
+
+def select_k(X, candidates=K_CANDIDATES, workers=None):
+    # Score every candidate k; returns (k with the best silhouette, k at the
+    # elbow of the inertia, the table of scores)
+    candidates = [k for k in candidates if 2 <= k < len(X)]
+    workers = workers or os.cpu_count() or 1
+    if len(X) > MINIBATCH_THRESHOLD and workers > 1 and len(candidates) > 1:
+        # spawn, as in forecasts.forecast_many: this can run in a thread of the Streamlit server
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(candidates)), mp_context=context) as pool:
+            scores = list(pool.map(_score_k, [X] * len(candidates), candidates))
+    else:
+        scores = [_score_k(X, k) for k in candidates]
+    selection = pd.DataFrame(scores, columns=['k', 'inertia', 'silhouette'])
+    best = int(selection.loc[selection['silhouette'].idxmax(), 'k'])
+    return best, _elbow(selection), selection
+
+
+def _principal_components(X):
+    from sklearn.decomposition import PCA
+
+    pca = PCA(n_components=2, random_state=RANDOM_STATE)
+    return pca.fit_transform(X), [float(ratio) for ratio in pca.explained_variance_ratio_]
+
+
+def _compute(features, k):
+    from sklearn.preprocessing import StandardScaler
+
+    # Normalize the data
+    X = StandardScaler().fit_transform(features)
+
+    with tracing.span('model/kmeans', rows=len(X)):
+        elbow_k, selection = None, None
+        if k is None:
+            k, elbow_k, selection = select_k(X)
+        model = _kmeans(k, len(X))
+        labels = model.fit_predict(X)
+    components, explained = _principal_components(X)
+
+    return {
+        'k': int(k),
+        'method': type(model).__name__,
+        'elbow_k': elbow_k,
+        'selection': None if selection is None else selection.to_dict(orient='list'),
+        'geographies': [str(name) for name in features.index],
+        'labels': [int(label) for label in labels],
+        'components': components.tolist(),
+        'explained_variance': explained,
+    }
+
+
+def _as_result(stored):
+    # The stored (JSON-friendly) form as frames
+    index = pd.Index(stored['geographies'], name='Geography')
+    points = pd.DataFrame(stored['components'], index=index, columns=['PC1', 'PC2'])
+    points['Cluster'] = stored['labels']
+    selection = stored['selection']
+    return dict(stored, points=points, selection=None if selection is None else pd.DataFrame(selection))
+
+
+def cluster_geographies(df, k=None):
+    # Cluster assignment and 2-D PCA coordinates of every geography, with k fixed
+    # or chosen automatically. Returns a dict with 'points' (PC1, PC2, Cluster per
+    # geography), 'k', 'method', 'explained_variance' and, for an automatic k,
+    # 'selection' (inertia and silhouette per candidate) and 'elbow_k'.
+    features = feature_matrix(df)
+    fingerprint = datasets.frame_fingerprint(features)
+    key = (fingerprint, k)
+    with tracing.span('model/clusters', rows=len(features)) as span:
+        with _lock:
+            result = _memory.get(key)
+        if result is not None:
+            span.cache = 'memory'
+            return result
+
+        path = cache_path('clusters', f"{fingerprint[:16]}__k{'auto' if k is None else k}.json")
+        try:
+            with open(path) as file:
+                stored = json.load(file)
+            span.cache = 'disk'
+        except (OSError, ValueError):
+            span.cache = 'miss'
+            stored = _compute(features, k)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump(stored, file)
+            os.replace(tmp_path, path)
+
+        result = _as_result(stored)
+        with _lock:
+            _memory[key] = result
+        return result
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dd_core import datasets, tracing
+from dd_core.paths import cache_path
+
+# Precomputed aggregates of the income dataset: one row per
+# education level x wage class x age group x type of work x sex, holding the
+# sum, mean, max and count of the wages in that cell. Every summary on the m1
+# page can be rolled up from these cells (means as sum / count), so the page
+# never has to scan the raw rows.
+DATASET = 'income_levels_by_education'
+DIMENSIONS = ['Education level', 'Wages', 'Age group', 'Type of work']
+MEASURES = ['Male', 'Female', 'Both Sexes']
+SEX = 'Sex'
+
+_METADATA_KEY = b'dd_cube_source'
+
+
+def cube_path():
+    return cache_path('cube', f'{DATASET}.parquet')
+
+
+def build_cube(data):
+    long_data = data.melt(id_vars=DIMENSIONS, value_vars=MEASURES, var_name=SEX, value_name='value')
+    grouped = long_data.groupby(DIMENSIONS + [SEX], observed=True, dropna=False)['value']
+    return grouped.agg(['sum', 'mean', 'max', 'count']).reset_index()
+
+
+def combine_cubes(cubes):
+    # Merge the cubes of disjoint parts of the data into the cube of the whole
+    cells = pd.concat(cubes, ignore_index=True)
+    grouped = cells.groupby(DIMENSIONS + [SEX], observed=True, dropna=False)
+    combined = grouped.agg({'sum': 'sum', 'max': 'max', 'count': 'sum'})
+    combined.insert(1, 'mean', combined['sum'] / combined['count'])
+    return combined.reset_index()
+
+
+def build_cube_chunked(chunks):
+    # The cube folded chunk by chunk; memory is bounded by the chunk and the number of cells
+    cells = None
+    for chunk in chunks:
+        part = build_cube(chunk)
+        cells = part if cells is None else combine_cubes([cells, part])
+    return cells
+
+
+def save_cube(cube, version):
+    table = pa.Table.from_pandas(cube, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_METADATA_KEY] = json.dumps({'version': version}).encode()
+    path = cube_path()
+    tmp_path = f'{path}.tmp'
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _stored_version(path):
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if _METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[_METADATA_KEY])['version']
+
+
+def refresh_cube():
+    # Rebuild the cube file when the source CSV has changed since the last build
+    version = datasets.source_version(DATASET)
+    path = cube_path()
+    with tracing.span('cube/refresh') as span:
+        span.cache = 'hit'
+        if not os.path.exists(path) or _stored_version(path) != version:
+            span.cache = 'miss'
+            save_cube(build_cube_chunked(datasets.read_chunks(DATASET)), version)
+    return path
+
+
+def load_cube():
+    return pq.read_table(refresh_cube()).to_pandas(split_blocks=True, self_destruct=True)
+
+
+# Roll-ups used by the m1 page. The dimensions are categoricals in the CSV's
+# order of appearance; the roll-ups list them sorted by name, like the
+# groupby/pivot_table on the raw text did and like the MongoDB aggregations do.
+
+def _by_name(table):
+    table.index = table.index.astype(object)
+    return table.sort_index()
+
+
+def summarize(cube, by):
+    # Sum and mean of every measure per value of `by`, one column per measure
+    grouped = cube.groupby([by, SEX], observed=True)[['sum', 'count']].sum()
+    sums = grouped['sum'].unstack(SEX)[MEASURES]
+    means = (grouped['sum'] / grouped['count']).unstack(SEX)[MEASURES]
+    sums.columns.name = means.columns.name = None
+    return _by_name(sums), _by_name(means)
+
+
+def pivot(cube, measure):
+    # Same layout as pd.pivot_table(data, values=[measure], index=['Education level'],
+    # columns=['Wages'], aggfunc={measure: [max, np.mean]})
+    cells = cube[cube[SEX] == measure].groupby(['Education level', 'Wages'], observed=True)
+    rolled = pd.DataFrame({
+        'max': cells['max'].max(),
+        'mean': cells['sum'].sum() / cells['count'].sum(),
+    })
+    table = rolled.unstack('Wages')
+    table.columns = pd.MultiIndex.from_tuples(
+        [(measure, stat, str(wages)) for stat, wages in table.columns], names=[None, None, 'Wages'])
+    return _by_name(table).sort_index(axis=1)
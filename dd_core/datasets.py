@@ -0,0 +1,336 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dd_core import tracing
+from dd_core.paths import CONTENT_DIR, cache_path
+
+# Every CSV under content/ with the typing it needs. Dates are parsed with the
+# exact format(s) of each file, percentage strings and numbers written with
+# thousands separators ('1,368.70') become floats, and column names lose the
+# stray spaces the exports come with (e.g. '  Male'). A value that does not parse
+# is an error, never silently turned into NaN. Known typos in the
+# exports are corrected explicitly rather than coerced away: 'corrections' replace
+# a value wherever it occurs, 'row_corrections' fix single rows by their position
+# in the file (0 = first data row). 'monthly' datasets must have exactly one row
+# per month (per `by` category), checked on every build.
+#
+# The typed form is also the compact one: text columns repeated on every row
+# ('categories') become categoricals, and integer columns are stored in the
+# smallest integer type holding their values ('downcast'). Floats stay float64,
+# as their decimal values would not survive float32. The pages share one loaded
+# instance per dataset, so the frames must be treated as read-only.
+#
+# The labour-market exports label October 2021 as '10-01-2020', which duplicates
+# October 2020 and leaves a gap at October 2021.
+DATASETS = {
+    'income_levels_by_education': {
+        'file': 'dd_m1_income_levels_by_education.csv',
+        'categories': ['GEO', 'Type of work', 'Wages', 'Education level', 'Age group'],
+        'downcast': True,
+    },
+    'geographic_education_distribution': {
+        'file': 'dd_m3_geographic_education_distribution.csv',
+        'categories': ['Geography', 'Educational attainment level'],
+        'downcast': True,
+    },
+    'employment': {
+        'file': 'labour-market-report-1.csv',
+        'dates': {'Date': '%m-%d-%Y'},
+        'row_corrections': {'Date': {201: '10-01-2021'}},
+        'monthly': {'date': 'Date'},
+    },
+    'industry_employment': {
+        'file': 'labour-market-report-2.csv',
+        'dates': {'Month': '%m/%d/%Y'},
+        'row_corrections': {'Month': dict.fromkeys(range(399, 418), '10/01/2021')},
+        'categories': ['SIC'],
+        'monthly': {'date': 'Month', 'by': 'SIC'},
+    },
+    'occupation_employment': {
+        'file': 'labour-market-report-3.csv',
+        'dates': {'Month': '%m/%d/%Y'},
+        'numeric': ['Employment, Ontario (000)'],
+        'categories': ['Broad occupational category'],
+        'monthly': {'date': 'Month', 'by': 'Broad occupational category'},
+    },
+    'unemployment_rates': {
+        'file': 'labour-market-report-4.csv',
+        'dates': {'Date': ['%m-%d-%Y', '%B %Y']},
+        'corrections': {'Date': {'Setember 2009': 'September 2009'}},
+        'row_corrections': {'Date': {201: '10-01-2021'}},
+        'monthly': {'date': 'Date'},
+    },
+    'cpi_wage_change': {
+        'file': 'labour-market-report-5.csv',
+        'dates': {'Date': '%m/%d/%Y'},
+        'percent': ['CPI Inflation', 'Wage Change'],
+        'row_corrections': {'Date': {81: '10/01/2021'}},
+        'monthly': {'date': 'Date'},
+    },
+}
+
+# Bump when the typing code below changes, so the stored tables are rebuilt
+TYPING_REVISION = 2
+
+_METADATA_KEY = b'dd_source'
+
+
+def source_path(name):
+    return os.path.join(CONTENT_DIR, DATASETS[name]['file'])
+
+
+def table_path(name):
+    return cache_path('parquet', f'{name}.parquet')
+
+
+def _file_sha256(path, size=None):
+    # Hash of the file, or of its first `size` bytes
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as file:
+        while remaining is None or remaining > 0:
+            block = file.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _source_stat(path):
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _spec_hash(name):
+    # Part of the stored build info, so a change of the typing rules rebuilds the table
+    payload = json.dumps([TYPING_REVISION, DATASETS[name]], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def source_version(name):
+    # Cheap version token for the source CSV, handy as a cache key in the modules
+    stat = _source_stat(source_path(name))
+    return f"{stat['mtime_ns']}-{stat['size']}-{_spec_hash(name)}"
+
+
+def _parse_dates(values, date_formats):
+    if isinstance(date_formats, str):
+        date_formats = [date_formats]
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for date_format in date_formats:
+        missing = parsed.isna()
+        parsed[missing] = pd.to_datetime(values[missing], format=date_format, errors='coerce')
+    unparsed = values[parsed.isna() & values.notna()]
+    if not unparsed.empty:
+        raise ValueError(f'Unparseable dates in {values.name!r}: {unparsed.unique().tolist()}')
+    return parsed
+
+
+def _parse_numbers(values, suffix=''):
+    # Floats from text like '1,368.70' or '1.60%' (with `suffix` '%'); empty cells become NaN
+    text = values.where(values.isna(), values.astype(str).str.strip().str.replace(',', '', regex=False)
+                        .str.removesuffix(suffix))
+    parsed = pd.to_numeric(text.replace('', None), errors='coerce')
+    unparsed = values[parsed.isna() & text.notna() & (text != '')]
+    if not unparsed.empty:
+        raise ValueError(f'Unparseable numbers in {values.name!r}: {unparsed.unique().tolist()[:5]}')
+    return parsed.astype('float64')
+
+
+def _typed(name, df, first_row=0):
+    # Type the raw rows of a dataset; `first_row` is the position of the first of
+    # them in the file, for the row corrections
+    spec = DATASETS[name]
+    df.columns = df.columns.str.strip()
+    df.index = pd.RangeIndex(first_row, first_row + len(df))
+    for column, values in spec.get('corrections', {}).items():
+        df[column] = df[column].replace(values)
+    for column, values in spec.get('row_corrections', {}).items():
+        rows = [row for row in values if row in df.index]
+        df.loc[rows, column] = [values[row] for row in rows]
+    for column, date_formats in spec.get('dates', {}).items():
+        df[column] = _parse_dates(df[column], date_formats)
+    for column in spec.get('percent', []):
+        df[column] = _parse_numbers(df[column], suffix='%')
+    for column in spec.get('numeric', []):
+        df[column] = _parse_numbers(df[column])
+    for column in spec.get('categories', []):
+        # Categories in order of appearance, the order the plots list them in
+        df[column] = df[column].astype(pd.CategoricalDtype(df[column].dropna().unique()))
+    if spec.get('downcast'):
+        for column in df.select_dtypes(include='integer').columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df.reset_index(drop=True)
+
+
+def read_csv(name):
+    # Parse the raw CSV into its typed form
+    return _typed(name, pd.read_csv(source_path(name), encoding='utf-8-sig'))
+
+
+def read_chunks(name, chunk_rows=100_000):
+    # The typed rows of the CSV, `chunk_rows` at a time, so files larger than
+    # memory can be folded into aggregates (see dd_core/streaming.py)
+    first_row = 0
+    with pd.read_csv(source_path(name), encoding='utf-8-sig', chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield _typed(name, chunk, first_row)
+            first_row += len(chunk)
+
+
+def read_rows(name, start, count):
+    # Typed rows [start, start + count) of the CSV; the rows before are skipped without being parsed
+    df = pd.read_csv(source_path(name), encoding='utf-8-sig', skiprows=range(1, start + 1), nrows=count)
+    return _typed(name, df, start)
+
+
+def _read_appended(name, offset, first_row):
+    # Parse only the rows after byte `offset` of the CSV (with the header of the file)
+    with open(source_path(name), 'rb') as file:
+        header = file.readline()
+        file.seek(offset)
+        tail = file.read()
+    return _typed(name, pd.read_csv(io.BytesIO(header + tail), encoding='utf-8-sig'), first_row)
+
+
+def validate_months(name, df):
+    # A monthly dataset must have exactly one row per month, in order, without
+    # gaps (per category of its `by` column)
+    spec = DATASETS[name].get('monthly')
+    if not spec:
+        return
+    ordinals = pd.Series(df[spec['date']].dt.to_period('M').array.asi8, index=df.index)
+    groups = df[spec['by']] if 'by' in spec else pd.Series(0, index=df.index)
+    steps = ordinals.groupby(groups.to_numpy(), sort=False).diff()
+    bad = steps.notna() & (steps != 1)
+    if bad.any():
+        problems = []
+        for row in df.index[bad.to_numpy()][:5]:
+            kind = 'duplicate' if steps[row] == 0 else 'gap before' if steps[row] > 1 else 'out of order'
+            problems.append(f"row {row}: {kind} {df.at[row, spec['date']]:%Y-%m}")
+        raise ValueError(f'{name}: {int(bad.sum())} months out of sequence ({"; ".join(problems)})')
+
+
+def _stored_source(path):
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if _METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[_METADATA_KEY])
+
+
+def _write_table(path, table, source):
+    metadata = dict(table.schema.metadata or {})
+    metadata[_METADATA_KEY] = json.dumps(source).encode()
+    tmp_path = f'{path}.tmp'
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _can_append(csv_path, stored, stat):
+    # True when the CSV only grew since the stored build: the old bytes are
+    # unchanged and ended with a complete line
+    if stat['size'] <= stored['size'] or stored['size'] == 0:
+        return False
+    with open(csv_path, 'rb') as file:
+        file.seek(stored['size'] - 1)
+        if file.read(1) != b'\n':
+            return False
+    return _file_sha256(csv_path, stored['size']) == stored['sha256']
+
+
+def ingest(name):
+    # Bring the typed Parquet file up to date with the CSV and report what was done:
+    #  - 'unchanged': same mtime and size as the stored build
+    #  - 'touched':   new mtime, same content
+    #  - 'appended':  the CSV only grew; just the new rows are parsed, validated
+    #                 (months continue the stored ones) and appended
+    #  - 'rebuilt':   anything else; the whole CSV is parsed again
+    csv_path = source_path(name)
+    path = table_path(name)
+    with tracing.span(f'dataset/build/{name}') as span:
+        stat = _source_stat(csv_path)
+        stored = _stored_source(path) if os.path.exists(path) else None
+        if stored and stored.get('spec') != _spec_hash(name):
+            stored = None
+        if stored and stored['mtime_ns'] == stat['mtime_ns'] and stored['size'] == stat['size']:
+            span.cache = 'hit'
+            return {'dataset': name, 'action': 'unchanged', 'path': path, 'rows': 0}
+
+        sha256 = _file_sha256(csv_path)
+        if stored and stored['sha256'] == sha256:
+            span.cache = 'hash'
+            action, rows = 'touched', 0
+            table = pq.read_table(path)
+        elif stored and _can_append(csv_path, stored, stat) and (appended := _append(name, path, stored)):
+            span.cache = 'append'
+            action = 'appended'
+            table, rows = appended
+        else:
+            span.cache = 'miss'
+            action = 'rebuilt'
+            df = read_csv(name)
+            validate_months(name, df)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            rows = table.num_rows
+        span.rows = rows
+        _write_table(path, table, dict(stat, sha256=sha256, spec=_spec_hash(name)))
+        return {'dataset': name, 'action': action, 'path': path, 'rows': rows}
+
+
+def _append(name, path, stored):
+    # The stored table with the rows appended to the CSV, and their count; None
+    # when the new rows do not fit the stored column types (e.g. an integer column
+    # outgrowing its downcast type), which calls for a rebuild
+    old_table = pq.read_table(path)
+    new_rows = _read_appended(name, stored['size'], old_table.num_rows)
+    monthly = DATASETS[name].get('monthly')
+    if monthly:
+        # Only the date and category columns of the stored rows are needed
+        columns = [monthly['date']] + ([monthly['by']] if 'by' in monthly else [])
+        validate_months(name, pd.concat([old_table.select(columns).to_pandas(), new_rows[columns]],
+                                        ignore_index=True))
+    try:
+        new_table = pa.Table.from_pandas(new_rows, preserve_index=False).cast(old_table.schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return None
+    return pa.concat_tables([old_table, new_table]), new_table.num_rows
+
+
+def build(name):
+    # Convert the CSV into its typed Parquet file, unless the source is unchanged.
+    # mtime/size are checked first; only when they differ is the file hashed, so
+    # a `touch` or a fresh checkout does not force a rebuild, and a CSV that only
+    # gained rows at the end is appended to instead of parsed again.
+    return ingest(name)['path']
+
+
+def load_table(name):
+    path = build(name)
+    with tracing.span(f'dataset/load/{name}') as span:
+        table = pq.read_table(path)
+        span.rows = table.num_rows
+        return table
+
+
+def load(name):
+    # The Parquet pages are decoded onto the heap either way; converting column by
+    # column and releasing each Arrow buffer once converted keeps the peak near one
+    # copy of the data instead of two
+    return load_table(name).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def frame_fingerprint(df):
+    # Content hash of a loaded frame, for data that does not come from a CSV (e.g. MongoDB)
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
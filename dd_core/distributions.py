@@ -0,0 +1,78 @@
+import numpy as np
+
+# Density (KDE) and ECDF curves of the m1 measures per group, computed once from
+# the binned counts of dd_core.streaming (one pass over the data, chunked or
+# not) and stored on fixed grids as float32 arrays. The page draws the stored
+# curves, so rendering costs the same whatever the number of rows. The KDEs
+# follow seaborn's displot defaults: Gaussian kernel, Scott's bandwidth, the
+# curve extending 3 bandwidths past the data, and each group's density scaled
+# by its share of the rows (common_norm); ECDF curves are proportions per group.
+GRID_POINTS = 512
+CUT = 3
+
+
+def _bandwidth(centers, weights):
+    # Scott's rule on the binned data: n ** (-1/5) times the standard deviation
+    n = weights.sum()
+    mean = np.average(centers, weights=weights)
+    std = np.sqrt(np.average((centers - mean) ** 2, weights=weights))
+    return std * n ** (-1 / 5)
+
+
+def kde_grid(centers, weights, points=GRID_POINTS):
+    # Binned KDE: the weighted points are spread linearly onto an even grid and
+    # convolved with the Gaussian kernel through the FFT. Returns (grid, density),
+    # or None when the values have no spread
+    bandwidth = _bandwidth(centers, weights)
+    if not bandwidth > 0:
+        return None
+    grid = np.linspace(centers.min() - CUT * bandwidth, centers.max() + CUT * bandwidth, points)
+    delta = grid[1] - grid[0]
+
+    position = (centers - grid[0]) / delta
+    left = np.clip(np.floor(position).astype(np.intp), 0, points - 2)
+    right_share = position - left
+    binned = (np.bincount(left, weights * (1 - right_share), minlength=points)
+              + np.bincount(left + 1, weights * right_share, minlength=points))
+
+    # Kernel on offsets -(points - 1)..(points - 1); zero padding keeps the convolution linear
+    offsets = np.arange(-(points - 1), points) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = 1 << int(np.ceil(np.log2(3 * points)))
+    convolved = np.fft.irfft(np.fft.rfft(binned, size) * np.fft.rfft(kernel, size), size)
+    density = convolved[points - 1:2 * points - 1] / weights.sum()
+    return grid, np.clip(density, 0, None)
+
+
+def ecdf_grid(histogram, points=GRID_POINTS):
+    # Proportion of the values up to every bin edge, thinned to at most `points` edges
+    edges = (np.arange(histogram.start, histogram.start + len(histogram.counts) + 1)) * histogram.width
+    proportion = np.concatenate([[0.0], np.cumsum(histogram.counts) / histogram.total])
+    if len(edges) > points:
+        keep = np.unique(np.linspace(0, len(edges) - 1, points).round().astype(np.intp))
+        edges, proportion = edges[keep], proportion[keep]
+    return edges, proportion
+
+
+def grids(histograms):
+    # {(kind, measure, group column): [(group, x, y), ...]} for kind 'kde' and
+    # 'ecdf', from {(measure, group column, group): Histogram}
+    totals = {}
+    for (measure, group_column, _), histogram in histograms.items():
+        totals[(measure, group_column)] = totals.get((measure, group_column), 0) + histogram.total
+
+    curves = {}
+    for (measure, group_column, group), histogram in histograms.items():
+        if not histogram.total:
+            continue
+        nonzero = histogram.counts > 0
+        kde = kde_grid(histogram.centers[nonzero], histogram.counts[nonzero])
+        if kde is not None:
+            x, density = kde
+            share = histogram.total / totals[(measure, group_column)]
+            curves.setdefault(('kde', measure, group_column), []).append(
+                (group, x.astype('float32'), (density * share).astype('float32')))
+        x, proportion = ecdf_grid(histogram)
+        curves.setdefault(('ecdf', measure, group_column), []).append(
+            (group, x.astype('float32'), proportion.astype('float32')))
+    return curves
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+# Server-side downsampling of long series before they are sent to the browser.
+# Charts show the range picked with their range slider, reduced with
+# Largest-Triangle-Three-Buckets (LTTB) to at most MAX_POINTS points, and draw
+# them with WebGL (Scattergl). The payload and the browser's render time then
+# depend on the chart's width instead of the number of rows; series shorter
+# than MAX_POINTS are sent as they are.
+MAX_POINTS = 1_500  # about one point per horizontal pixel of a wide chart
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    # Positions of the `threshold` points of (x, y) that keep the shape of the
+    # line: the first and last point, plus per bucket the point forming the
+    # largest triangle with the previously kept point and the next bucket's mean
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # threshold - 2 buckets between the first and the last point
+    bounds = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.intp), n)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end, next_end = bounds[i], bounds[i + 1], bounds[i + 2]
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _numeric(x):
+    # LTTB works on numbers; dates become nanoseconds
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype('int64').to_numpy(dtype='float64')
+    return np.asarray(x, dtype='float64')
+
+
+def visible(df, x, y, start=None, end=None, threshold=MAX_POINTS):
+    # The rows of `df` (sorted by `x`) between start and end, downsampled on (x, y);
+    # rows without a y value are dropped
+    rows = df[df[y].notna()]
+    if start is not None:
+        rows = rows[rows[x] >= start]
+    if end is not None:
+        rows = rows[rows[x] <= end]
+    return rows.iloc[lttb(_numeric(rows[x]), rows[y], threshold)]
+
+
+def visible_groups(df, x, y, by, start=None, end=None, threshold=MAX_POINTS):
+    # `visible` for every group of `by`, each downsampled on its own
+    frames = [visible(group, x, y, start, end, threshold) for _, group in df.groupby(by, sort=False, observed=True)]
+    return pd.concat(frames) if frames else df.iloc[:0]
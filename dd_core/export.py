@@ -0,0 +1,319 @@
+import contextlib
+import glob
+import hashlib
+import html
+import importlib
+import inspect
+import json
+import os
+import re
+import shutil
+import time
+import types
+
+import pandas as pd
+
+from dd_core import figures, geo, precompute, sections
+from dd_core.paths import ROOT_DIR
+
+# Static export of the dashboard (see scripts/export.py). Every section of every
+# page is rendered headless: the section's own renderer runs with a Recorder in
+# place of `st`, which collects the headings, text, tables and figures it would
+# have shown, and the result is written as an HTML page with its PNG images,
+# Plotly JSON, table JSON and map HTML next to it. Sections with widgets are
+# exported once per value listed in the page's EXPORT_VARIANTS (e.g. every
+# geography of m3). Each exported section records the key of its inputs (the
+# data and artifact versions the page reads, the map boundaries and the page's
+# code); a later export skips sections whose key is unchanged.
+MODULES = {
+    'm1': {'module': 'dd_m1_income_levels_by_education', 'title': 'Income Levels by Education',
+           'datasets': ['income_levels_by_education'], 'jobs': ['income_pivots', 'income_distributions']},
+    'm2': {'module': 'dd_m2_employment_trends_and_insights', 'title': 'Employment Trends and Insights',
+           'datasets': ['employment', 'industry_employment', 'occupation_employment', 'unemployment_rates',
+                        'cpi_wage_change'],
+           'jobs': ['employment_forecast_6', 'employment_forecast_36', 'employment_decomposition',
+                    'series_forecasts', 'employment_backtest', 'series_backtests']},
+    'm3': {'module': 'dd_m3_geographic_education_distribution', 'title': 'Geographic Education Distribution',
+           'datasets': ['geographic_education_distribution'], 'jobs': ['state_clusters']},
+}
+
+# Bump when the bundle layout changes, so every section is exported again
+REVISION = 2
+MANIFEST = 'manifest.json'
+PLOTLY_JS = 'plotly.min.js'
+# Rows of a table shown in its HTML page; the JSON file has all of them
+HTML_TABLE_ROWS = 500
+
+
+class Recorder:
+    # Stand-in for the `streamlit` module while a section renders: output calls
+    # are recorded as (kind, value) items, widgets return the value chosen for
+    # their key (else their default) and everything else is a no-op
+    def __init__(self, choices=None):
+        self.items = []
+        self.choices = choices or {}
+
+    def _choose(self, key, default):
+        return self.choices.get(key, default)
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            if isinstance(arg, (pd.DataFrame, pd.Series)):
+                self.items.append(('table', arg))
+            else:
+                self.items.append(('markdown', str(arg)))
+
+    def markdown(self, body, **kwargs):
+        self.items.append(('markdown', body))
+
+    def dataframe(self, data, **kwargs):
+        self.items.append(('table', data))
+
+    def subheader(self, body, **kwargs):
+        self.items.append(('heading', body))
+
+    def image(self, image, **kwargs):
+        self.items.append(('png', image))
+
+    def plotly_chart(self, figure, **kwargs):
+        self.items.append(('plotly', figure.to_json()))
+
+    def html(self, body, **kwargs):
+        self.items.append(('html', body))
+
+    @property
+    def components(self):
+        # st.components.v1.html, used for the maps
+        return types.SimpleNamespace(v1=types.SimpleNamespace(html=self.component))
+
+    def component(self, body, **kwargs):
+        self.items.append(('component', body))
+
+    def expander(self, label, **kwargs):
+        self.items.append(('heading', label))
+        return contextlib.nullcontext()
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        options = list(options)
+        return self._choose(key, options[index] if options else None)
+
+    def radio(self, label, options, index=0, key=None, **kwargs):
+        return self.selectbox(label, options, index, key)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._choose(key, value if value is not None else min_value)
+
+    def select_slider(self, label, options=(), value=None, key=None, **kwargs):
+        options = list(options)
+        return self._choose(key, value if value is not None else (options[0] if options else None))
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._choose(key, value if value is not None else min_value)
+
+    def toggle(self, label, value=False, key=None, **kwargs):
+        return self._choose(key, True)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@contextlib.contextmanager
+def recording(page, recorder):
+    # Route the `st` calls of the page and of the figure helpers to the recorder
+    modules = [page, figures, sections]
+    saved = [module.st for module in modules]
+    for module in modules:
+        module.st = recorder
+    try:
+        yield recorder
+    finally:
+        for module, st in zip(modules, saved):
+            module.st = st
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'section'
+
+
+def page_sections(page):
+    # (title, renderer) of every section of a page module
+    return [(entry[0], entry[1]) for entry in page.SECTIONS]
+
+
+def _code_hash(page):
+    # The page and every dd_core module, as the sections draw with the figure builders and helpers there
+    digest = hashlib.sha256(inspect.getsource(page).encode())
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def tasks(modules=None):
+    # One task per section and widget variant: a dict with the section id, the
+    # page, the section title, the widget choices, its position on the page and
+    # the key of its inputs
+    planned = []
+    for name in modules or list(MODULES):
+        spec = MODULES[name]
+        page = importlib.import_module(spec['module'])
+        inputs = [REVISION, _code_hash(page), geo.regions_version()]
+        inputs += [precompute.input_version(dataset) for dataset in spec['datasets']]
+        inputs += [precompute.job_version(job) for job in spec['jobs']]
+        variants = getattr(page, 'EXPORT_VARIANTS', {})
+        for title, _ in page_sections(page):
+            section_id = f'{name}/{slug(title)}'
+            for choices in (variants[title]() if title in variants else [{}]):
+                variant_id = '/'.join([section_id] + [slug(value) for value in choices.values()])
+                key = hashlib.sha256(json.dumps(inputs + [choices], default=str).encode()).hexdigest()
+                planned.append({'id': variant_id, 'module': name, 'title': title, 'choices': choices,
+                                'position': len(planned), 'key': key})
+    return planned
+
+
+def _table_files(directory, number, table):
+    frame = table.to_frame() if isinstance(table, pd.Series) else table
+    file = f'table-{number}.json'
+    with open(os.path.join(directory, file), 'w') as out:
+        out.write(frame.to_json(orient='split', date_format='iso', default_handler=str))
+    note = '' if len(frame) <= HTML_TABLE_ROWS else f'<p>First {HTML_TABLE_ROWS} of {len(frame)} rows.</p>'
+    return file, frame.head(HTML_TABLE_ROWS).to_html(border=0, classes='table') + note
+
+
+def _write_section(directory, task, items, depth):
+    # The section page and its files; returns the files written
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    files, body = [], []
+    for number, (kind, value) in enumerate(items, 1):
+        if kind == 'heading':
+            body.append(f'<h3>{html.escape(str(value))}</h3>')
+        elif kind == 'markdown':
+            body.append(f'<div class="text">{html.escape(value)}</div>')
+        elif kind == 'html':
+            body.append(value)
+        elif kind == 'component':
+            file = f'component-{number}.html'
+            with open(os.path.join(directory, file), 'w') as out:
+                out.write(value)
+            files.append(file)
+            body.append(f'<iframe src="{file}" style="width: 100%; height: 500px; border: 0"></iframe>')
+        elif kind == 'table':
+            file, table_html = _table_files(directory, number, value)
+            files.append(file)
+            body.append(f'{table_html}<p><a href="{file}">JSON</a></p>')
+        elif kind == 'png':
+            file = f'figure-{number}.png'
+            with open(os.path.join(directory, file), 'wb') as out:
+                out.write(value)
+            files.append(file)
+            body.append(f'<img src="{file}" style="max-width: 100%">')
+        elif kind == 'plotly':
+            file = f'figure-{number}.json'
+            with open(os.path.join(directory, file), 'w') as out:
+                out.write(value)
+            files.append(file)
+            # '</' would end the script element early (e.g. a label containing '</script>')
+            inline = value.replace('</', '<\\/')
+            body.append(f'<div id="figure-{number}"></div><script>(function () {{ var figure = {inline}; '
+                        f'Plotly.newPlot("figure-{number}", figure.data, figure.layout, {{responsive: true}}); }})();</script>')
+
+    title = task['title'] + ''.join(f' - {value}' for value in task['choices'].values())
+    root = '../' * depth
+    page = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<script src="{root}{PLOTLY_JS}"></script>'
+            '<style>body { font-family: sans-serif; max-width: 1200px; margin: auto; } '
+            '.text { white-space: pre-wrap; }</style></head><body>'
+            f'<p><a href="{root}index.html">Contents</a></p><h2>{html.escape(title)}</h2>'
+            + '\n'.join(body) + '</body></html>')
+    with open(os.path.join(directory, 'index.html'), 'w') as out:
+        out.write(page)
+    return ['index.html'] + files
+
+
+def render_task(task, out_dir):
+    # Render one section into the bundle; runs in the export's process pool
+    start = time.perf_counter()
+    page = importlib.import_module(MODULES[task['module']]['module'])
+    render = dict(page_sections(page))[task['title']]
+    with recording(page, Recorder(task['choices'])) as recorder:
+        render()
+    directory = os.path.join(out_dir, *task['id'].split('/'))
+    files = _write_section(directory, task, recorder.items, depth=len(task['id'].split('/')))
+    return {'id': task['id'], 'entry': manifest_entry(task, files, time.perf_counter() - start)}
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def unchanged(task, manifest, out_dir):
+    entry = manifest.get(task['id'])
+    return (entry is not None and entry['key'] == task['key']
+            and all(os.path.exists(os.path.join(out_dir, *task['id'].split('/'), file)) for file in entry['files']))
+
+
+def remove_section(out_dir, section_id, entry):
+    # Delete the files of a section that is no longer exported, and its directories once empty
+    directory = os.path.join(out_dir, *section_id.split('/'))
+    for file in entry.get('files', []):
+        try:
+            os.remove(os.path.join(directory, file))
+        except FileNotFoundError:
+            pass
+    while os.path.abspath(directory) != os.path.abspath(out_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def manifest_entry(task, files, seconds):
+    # What the manifest keeps of an exported section: enough to skip it and to list it in the index
+    return {'key': task['key'], 'files': files, 'seconds': seconds, 'title': task['title'],
+            'choices': task['choices'], 'position': task['position']}
+
+
+def write_index(out_dir, manifest):
+    # Contents page of every section in the manifest (whichever export run wrote
+    # it), and the Plotly library the section pages load
+    from plotly.offline import get_plotlyjs
+
+    plotly_path = os.path.join(out_dir, PLOTLY_JS)
+    if not os.path.exists(plotly_path):
+        with open(plotly_path, 'w') as file:
+            file.write(get_plotlyjs())
+
+    lines = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Dashboard export</title>'
+             '<style>body { font-family: sans-serif; max-width: 1200px; margin: auto; }</style></head><body>',
+             '<h1>Education and the Mismatch in the Labor Market</h1>']
+    for name, spec in MODULES.items():
+        entries = sorted(((section, entry) for section, entry in manifest.items() if section.split('/')[0] == name),
+                         key=lambda item: (item[1].get('position', len(manifest)), item[0]))
+        if not entries:
+            continue
+        lines.append(f"<h2>{html.escape(spec['title'])}</h2><ul>")
+        for section, entry in entries:
+            label = entry.get('title', section) + ''.join(f' - {value}' for value in entry.get('choices', {}).values())
+            lines.append(f"<li><a href=\"{section}/index.html\">{html.escape(label)}</a></li>")
+        lines.append('</ul>')
+    lines.append('</body></html>')
+    with open(os.path.join(out_dir, 'index.html'), 'w') as file:
+        file.write('\n'.join(lines))
+
+
+def default_out_dir():
+    return os.path.join(ROOT_DIR, 'export')
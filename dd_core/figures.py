@@ -0,0 +1,80 @@
+import hashlib
+import io
+import threading
+
+import matplotlib.pyplot as plt
+import plotly.io as pio
+import streamlit as st
+import streamlit.components.v1
+from cachetools import LRUCache
+
+from dd_core import tracing
+
+# Rendered figures shared by every session of the process. A figure is keyed by
+# the fingerprint of the data it was drawn from, a name for the plot and the
+# widget values it depends on, so repeat views skip seaborn/matplotlib/plotly
+# entirely. Entries are PNG bytes (matplotlib, seaborn), Plotly JSON or the HTML
+# of a map, and the LRU is bounded by their total size.
+CACHE_BYTES = 64 * 1024 * 1024
+
+_cache = LRUCache(maxsize=CACHE_BYTES, getsizeof=len)
+_lock = threading.Lock()
+
+
+def figure_key(*parts):
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def _span_name(kind, key_parts):
+    # Key parts are (data version, plot name, widget values...)
+    return f'figure/{kind}/{key_parts[1]}' if len(key_parts) > 1 else f'figure/{kind}'
+
+
+def _cached(span_name, key, render):
+    with tracing.span(span_name) as span:
+        with _lock:
+            value = _cache.get(key)
+        span.cache = 'miss' if value is None else 'hit'
+        if value is None:
+            value = render()
+            with _lock:
+                _cache[key] = value
+        return value
+
+
+def png_bytes(fig):
+    # Same options st.pyplot uses, so cached images look exactly like before
+    image = io.BytesIO()
+    fig.savefig(image, format='png', bbox_inches='tight', dpi=200)
+    plt.close(fig)
+    return image.getvalue()
+
+
+def cached_png(key_parts, build):
+    # `build` returns a matplotlib Figure; it only runs on a cache miss
+    return _cached(_span_name('png', key_parts), figure_key('png', *key_parts), lambda: png_bytes(build()))
+
+
+def cached_plotly_json(key_parts, build):
+    # `build` returns a plotly Figure; it only runs on a cache miss
+    return _cached(_span_name('plotly', key_parts), figure_key('plotly', *key_parts), lambda: build().to_json())
+
+
+def pyplot(key_parts, build):
+    st.image(cached_png(key_parts, build), use_column_width=True)
+
+
+def plotly_chart(key_parts, build, **kwargs):
+    st.plotly_chart(pio.from_json(cached_plotly_json(key_parts, build)), **kwargs)
+
+
+def html(key_parts, build, height):
+    # `build` returns a standalone HTML document (e.g. a folium map); it is shown
+    # in a component iframe, so interacting with it does not rerun the page
+    body = _cached(_span_name('html', key_parts), figure_key('html', *key_parts), build)
+    st.components.v1.html(body, height=height)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from dd_core import datasets
+from dd_core.models import fit_arima
+
+# Forecasts of the Ontario employment series (labour-market-report-1), computed
+# by scripts/precompute.py and read by the m2 page through dd_core.precompute,
+# and the multi-series engine below for the other monthly reports.
+EMPLOYMENT = 'Ontario employment (x 1,000), seasonally adjusted'
+SOURCE = 'labour-market-report-1'
+
+# Monthly series of the other labour-market reports: one series per category of
+# `by`, or one per `value` column
+SERIES = {
+    'industry_employment': {'date': 'Month', 'by': 'SIC', 'value': 'Employment, Ontario (000)'},
+    'occupation_employment': {'date': 'Month', 'by': 'Broad occupational category',
+                              'value': 'Employment, Ontario (000)'},
+    'unemployment_rates': {'date': 'Date', 'value': ['Unemployment_rate_Canada', 'Unemployment_rate_Ontario']},
+}
+
+# Orders tried by the AIC selection; differenced once like the employment model
+ORDER_GRID = [(p, 1, q) for p in range(3) for q in range(3)]
+
+# Orders compared by the employment backtest (see dd_core.backtest); the page forecasts with ARIMA(1,1,1)
+BACKTEST_ORDERS = [(1, 1, 1), (0, 1, 1), (1, 1, 0)]
+
+
+def employment_series(df1):
+    # Monthly series indexed by the months of the 'Date' column itself, which must
+    # be consecutive (also checked when the data is ingested, see dd_core.datasets)
+    datasets.validate_months('employment', df1)
+    return monthly_series(df1[EMPLOYMENT], df1['Date']).rename(EMPLOYMENT)
+
+
+def employment_forecast(series, periods, steps):
+    # Fit ARIMA model to the data (cached per data fingerprint and order, in memory and on disk)
+    results = fit_arima(series, order=(1, 1, 1), source=SOURCE)
+
+    # Predictions for the `periods` months following the series
+    forecast = results.forecast(steps=steps).iloc[:periods]
+    return pd.DataFrame({'Forecast': forecast.to_numpy()}, index=forecast.index.to_timestamp())
+
+
+def seasonal_decomposition(series):
+    import statsmodels.api as sm
+
+    # Trend, Seasonal, and Residual components of an additive decomposition (monthly data)
+    decomposition = sm.tsa.seasonal_decompose(series, model='additive', period=12)
+    return pd.DataFrame({
+        'Trend': decomposition.trend,
+        'Seasonal': decomposition.seasonal,
+        'Residual': decomposition.resid,
+    }, index=series.index)
+
+
+# Multi-series engine
+
+def monthly_series(values, dates):
+    # Monthly PeriodIndex from the dates; the datasets are validated to have one row per month
+    return pd.Series(values.to_numpy(dtype='float64'), index=pd.PeriodIndex(dates, freq='M'))
+
+
+def collect_series(frames=None):
+    # {(dataset, series name): monthly series} for the datasets in SERIES, from
+    # the given {dataset: frame} or else every dataset loaded from disk
+    frames = frames or {name: datasets.load(name) for name in SERIES}
+    collected = {}
+    for name, df in frames.items():
+        spec = SERIES[name]
+        if 'by' in spec:
+            for category, group in df.groupby(spec['by'], sort=False, observed=True):
+                collected[(name, category)] = monthly_series(group[spec['value']], group[spec['date']])
+        else:
+            for column in spec['value']:
+                collected[(name, column)] = monthly_series(df[column], df[spec['date']])
+    return collected
+
+
+def _fit_best(key, series, orders):
+    # Fit every candidate order and keep the lowest AIC; orders that fail to fit are skipped
+    best = None
+    for order in orders:
+        try:
+            results = fit_arima(series, order=order, source=f'{key[0]}/{key[1]}')
+        except (ValueError, ArithmeticError):
+            continue
+        if best is None or results.aic < best[1].aic:
+            best = (order, results)
+    return best
+
+
+def forecast_series(key, series, steps=12, orders=None, alpha=0.05):
+    # Tidy forecast of one series: one row per step with its confidence interval
+    with warnings.catch_warnings():
+        # Convergence warnings of the candidate orders are expected; the AIC decides
+        warnings.simplefilter('ignore')
+        best = _fit_best(key, series, orders or [(1, 1, 1)])
+        if best is None:
+            return pd.DataFrame()
+        order, results = best
+        prediction = results.get_forecast(steps=steps)
+        interval = prediction.conf_int(alpha=alpha)
+
+    return pd.DataFrame({
+        'dataset': key[0],
+        'series': key[1],
+        'period': prediction.predicted_mean.index,
+        'step': range(1, steps + 1),
+        'forecast': prediction.predicted_mean.to_numpy(),
+        'lower': interval.iloc[:, 0].to_numpy(),
+        'upper': interval.iloc[:, 1].to_numpy(),
+        'order': [order] * steps,
+        'aic': results.aic,
+    })
+
+
+def _forecast_task(args):
+    return forecast_series(*args)
+
+
+def forecast_many(series, steps=12, orders=None, alpha=0.05, workers=None):
+    # Forecast every series of {key: series} (see collect_series) in a process
+    # pool. With `orders` (e.g. ORDER_GRID) each series gets the order with the
+    # lowest AIC, else ARIMA(1,1,1). Fitted parameters land in the shared disk
+    # cache of dd_core.models, so a rerun on unchanged data skips the optimisation.
+    tasks = [(key, values, steps, orders, alpha) for key, values in series.items()]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        frames = [_forecast_task(task) for task in tasks]
+    else:
+        # spawn: this also runs in a thread of the Streamlit server (see precompute.refresh), where
+        # forking the multi-threaded Streamlit server could deadlock the workers
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+            frames = list(pool.map(_forecast_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,192 @@
+import copy
+import functools
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from dd_core.paths import CONTENT_DIR
+
+# Map layer of the Canadian provinces and territories, read from the bundled
+# GeoJSON (features named like the m3 geographies). The outlines are simplified
+# once per zoom level with Douglas-Peucker and all levels are embedded in the
+# map; the browser shows the level matching its zoom, so panning and zooming
+# never reach the server. Pages render the map HTML through figures.html, which
+# caches it and shows it in a component iframe, so map interactions do not rerun
+# the page either. scripts/build_regions.py builds the GeoJSON from the Natural
+# Earth or Statistics Canada boundary files, with the attribution the map shows.
+REGIONS_FILE = os.path.join(CONTENT_DIR, 'canada_regions.geojson')
+
+# Zoom levels from which each simplified layer is shown; from the last on (about 150 m
+# per half pixel) the outlines are as detailed as a province-level map needs
+ZOOM_LEVELS = [0, 4, 6, 8]
+# Douglas-Peucker tolerance in screen pixels at the first zoom level of a layer. A
+# 256-pixel tile spans 360 / 2**zoom degrees of longitude, and around 60 N, where
+# most of the outlines are, a degree of latitude is drawn twice as tall
+PIXEL_TOLERANCE = 0.5
+TILE_SIZE = 256
+
+
+def zoom_tolerance(zoom):
+    # Tolerance in degrees of the layer shown from `zoom` on
+    return PIXEL_TOLERANCE * 360 / (TILE_SIZE * 2 ** zoom) * math.cos(math.radians(60))
+
+
+# Douglas-Peucker tolerance (degrees) of the layer shown from each zoom level on
+ZOOM_TOLERANCES = {zoom: zoom_tolerance(zoom) for zoom in ZOOM_LEVELS}
+
+CENTER = [58.0, -96.0]
+COLORMAP = ['#f7fbff', '#c6dbef', '#6baed6', '#2171b5', '#08306b']
+
+
+def regions_version():
+    with open(REGIONS_FILE, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=2)
+def _regions(version):
+    with open(REGIONS_FILE) as file:
+        return json.load(file)
+
+
+def regions():
+    return _regions(regions_version())
+
+
+def attribution():
+    # Credit line of the boundary data, shown on every map
+    return regions().get('properties', {}).get('attribution', '')
+
+
+def douglas_peucker(points, tolerance):
+    # Indices of the points of a line kept by Douglas-Peucker; iterative, so
+    # long boundaries do not hit the recursion limit
+    points = np.asarray(points, dtype='float64')
+    if tolerance <= 0 or len(points) < 3:
+        return np.arange(len(points))
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.extend([(first, split), (split, last)])
+    return np.flatnonzero(keep)
+
+
+def _simplify_ring(ring, tolerance):
+    # A closed ring keeps at least a triangle (4 positions with the closing one)
+    simplified = [ring[i] for i in douglas_peucker(ring, tolerance)]
+    return simplified if len(simplified) >= 4 else ring
+
+
+def simplify(collection, tolerance):
+    simplified = copy.deepcopy(collection)
+    for feature in simplified['features']:
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            geometry['coordinates'] = [_simplify_ring(ring, tolerance) for ring in geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            geometry['coordinates'] = [[_simplify_ring(ring, tolerance) for ring in polygon]
+                                       for polygon in geometry['coordinates']]
+    return simplified
+
+
+@functools.lru_cache(maxsize=2)
+def _zoom_layers(version):
+    collection = _regions(version)
+    return {zoom: simplify(collection, tolerance) for zoom, tolerance in ZOOM_TOLERANCES.items()}
+
+
+def zoom_layers():
+    # {minimum zoom: simplified FeatureCollection}
+    return _zoom_layers(regions_version())
+
+
+def _color(value, low, high):
+    if value is None or not np.isfinite(value):
+        return '#d9d9d9'
+    share = 0.0 if high == low else (value - low) / (high - low)
+    return COLORMAP[min(int(share * len(COLORMAP)), len(COLORMAP) - 1)]
+
+
+def region_map_html(values=None, caption=None, location=CENTER, zoom=3, highlight=None):
+    # Standalone HTML of a Leaflet map with the region outlines. With `values`
+    # ({region name: number}) the regions are shaded as a choropleth; `highlight`
+    # outlines one region more strongly.
+    import folium
+    from branca.colormap import StepColormap
+    from branca.element import MacroElement, Template
+
+    fmap = folium.Map(location=location, zoom_start=zoom)
+    finite = [value for value in (values or {}).values() if value is not None and np.isfinite(value)]
+    low, high = (min(finite), max(finite)) if finite else (0, 0)
+
+    def style(feature):
+        name = feature['properties']['name']
+        weight = 3 if name == highlight else 1
+        if values is None:
+            return {'color': '#08306b', 'weight': weight, 'fillOpacity': 0.05 if name != highlight else 0.25}
+        return {'color': '#555555', 'weight': weight, 'fillOpacity': 0.75,
+                'fillColor': _color(values.get(name), low, high)}
+
+    layers = []
+    for level, collection in sorted(zoom_layers().items()):
+        if values is not None:
+            # The cached layers are shared by every session; the values go into a copy
+            collection = copy.deepcopy(collection)
+            for feature in collection['features']:
+                value = values.get(feature['properties']['name'])
+                feature['properties']['value'] = '-' if value is None else f'{value:g}'
+        fields, aliases = ['name'], ['Region']
+        if values is not None:
+            fields, aliases = ['name', 'value'], ['Region', caption or 'Value']
+        layer = folium.GeoJson(collection, name=f'zoom {level}', style_function=style,
+                               tooltip=folium.GeoJsonTooltip(fields=fields, aliases=aliases))
+        layer.add_to(fmap)
+        layers.append((level, layer.get_name()))
+
+    if finite:
+        steps = np.linspace(low, high, len(COLORMAP) + 1).tolist()
+        StepColormap(COLORMAP, index=steps, vmin=low, vmax=high, caption=caption or '').add_to(fmap)
+
+    # Show only the layer simplified for the current zoom; added last, so its
+    # script runs after the map and the layers are defined
+    switch = MacroElement()
+    switch._template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var levels = [{% for level, name in this.levels %}[{{ level }}, {{ name }}], {% endfor %}];
+            function showLevel() {
+                var zoom = {{ this.map }}.getZoom(), shown = levels[0][1];
+                levels.forEach(function (level) { if (zoom >= level[0]) { shown = level[1]; } });
+                levels.forEach(function (level) {
+                    if (level[1] === shown) { {{ this.map }}.addLayer(level[1]); }
+                    else { {{ this.map }}.removeLayer(level[1]); }
+                });
+            }
+            {{ this.map }}.on('zoomend', showLevel);
+            showLevel();
+            {% if this.attribution %}{{ this.map }}.attributionControl.addAttribution({{ this.attribution|tojson }});{% endif %}
+        })();
+        {% endmacro %}
+    """)
+    switch.levels, switch.map, switch.attribution = layers, fmap.get_name(), attribution()
+    switch.add_to(fmap)
+    return fmap.get_root().render()
@@ -0,0 +1,144 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+from cachetools import LRUCache
+
+from dd_core import tracing
+from dd_core.paths import cache_path
+
+# Fitted models are kept in two tiers:
+#  - memory: an LRU shared by every session of the running process
+#  - disk:   the fitted parameters as JSON under .cache/models, so a fresh process
+#            only has to run the Kalman filter instead of the full optimisation
+# When a series only gained observations at the end (a new month was ingested),
+# the parameters fitted on the shorter series are reused and the Kalman filter
+# is run over the extended series, again without optimisation. After REFIT_AFTER
+# appended observations the model is fully refitted.
+REFIT_AFTER = 12
+
+_memory = LRUCache(maxsize=32)
+_lock = threading.Lock()
+
+
+def series_fingerprint(series):
+    # Hash of the values and the index, so a changed CSV gives a new fingerprint
+    hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def _order_tag(order):
+    return '-'.join(str(part) for part in order)
+
+
+def _slug(source):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', source)
+
+
+def _model_file(source, fingerprint, order):
+    return cache_path('models', f'{_slug(source)}__{fingerprint[:16]}__{_order_tag(order)}.json')
+
+
+def _evict_stale(source, fingerprint, order):
+    # Drop the models of this order that were fitted on an older version of the same source
+    for path in glob.glob(cache_path('models', f'{_slug(source)}__*__{_order_tag(order)}.json')):
+        if os.path.basename(path).split('__')[1] != fingerprint[:16]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    for key in [key for key in _memory if key[0] == source and key[1] != fingerprint and key[2] == order]:
+        del _memory[key]
+
+
+def _read_stored(path, order):
+    try:
+        with open(path) as file:
+            stored = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if tuple(stored['order']) != tuple(order):
+        return None
+    return stored
+
+
+def _params(stored):
+    return pd.Series(stored['params'], index=stored['param_names'])
+
+
+def _load_params(path, order):
+    stored = _read_stored(path, order)
+    return None if stored is None else _params(stored)
+
+
+def _extendable_params(source, series, order):
+    # Parameters fitted on an earlier version of the series that is a prefix of
+    # this one, and the number of observations appended since the last full fit
+    for path in glob.glob(cache_path('models', f'{_slug(source)}__*__{_order_tag(order)}.json')):
+        stored = _read_stored(path, order)
+        nobs = stored and stored.get('nobs')
+        if not nobs or nobs >= len(series):
+            continue
+        appended = stored.get('appended', 0) + len(series) - nobs
+        if appended <= REFIT_AFTER and series_fingerprint(series.iloc[:nobs]) == stored['fingerprint']:
+            return _params(stored), appended
+    return None, 0
+
+
+def _save_params(path, results, order, fingerprint, nobs, appended=0):
+    stored = {
+        'order': list(order),
+        'fingerprint': fingerprint,
+        'nobs': nobs,
+        'appended': appended,
+        'param_names': list(results.params.index),
+        'params': [float(value) for value in results.params],
+    }
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(stored, file)
+    os.replace(tmp_path, path)
+
+
+def fit_arima(series, order=(1, 1, 1), source=None):
+    # Fit (or reuse) an ARIMA model for the series. `source` names the dataset the
+    # series came from and is used to evict models fitted on older versions of it.
+    import statsmodels.api as sm
+
+    order = tuple(order)
+    source = source or str(series.name)
+    fingerprint = series_fingerprint(series)
+    key = (source, fingerprint, order)
+
+    with tracing.span('model/arima', rows=len(series)) as span:
+        with _lock:
+            results = _memory.get(key)
+            if results is not None:
+                span.cache = 'memory'
+                return results
+
+        path = _model_file(source, fingerprint, order)
+        model = sm.tsa.ARIMA(series, order=order)
+        params = _load_params(path, order) if os.path.exists(path) else None
+        if params is not None:
+            span.cache = 'disk'
+            results = model.filter(params)
+        else:
+            params, appended = _extendable_params(source, series, order)
+            if params is not None:
+                span.cache = 'extend'
+                results = model.filter(params)
+            else:
+                span.cache = 'miss'
+                results = model.fit()
+            _save_params(path, results, order, fingerprint, len(series), appended)
+
+        with _lock:
+            # Older versions are only dropped now that they had their chance to be extended
+            _evict_stale(source, fingerprint, order)
+            _memory[key] = results
+        return results
@@ -0,0 +1,238 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dd_core import tracing
+from dd_core.streaming import GROUPS, MAX_BINS, MEASURES, Histogram, Moments
+
+# Set DD_DATA_SOURCE=mongo to have the modules read the collections populated by
+# scripts/mongo_script.py instead of the CSVs under content/
+DATA_SOURCE = os.environ.get('DD_DATA_SOURCE', 'csv')
+MONGO_URI = os.environ.get('DD_MONGO_URI', "mongodb://127.0.0.1:27017/?directConnection=true")
+DB_NAME = os.environ.get('DD_MONGO_DB', 'Data-Dynamos-DB')
+
+INCOME_COLLECTION = 'income_levels_by_education_collection'
+GEOGRAPHIC_COLLECTION = 'geographic_education_distribution_collection'
+EMPLOYMENT_COLLECTION = 'employment_forecast_collection'
+
+# Document fields of the income collection and the dataset columns they map to
+INCOME_FIELDS = {
+    'year': 'YEAR',
+    'region': 'GEO',
+    'type of work': 'Type of work',
+    'wages': 'Wages',
+    'level of education': 'Education level',
+    'age group': 'Age group',
+    'both sex combined': 'Both Sexes',
+    'male': 'Male',
+    'female': 'Female',
+}
+INCOME_MEASURES = {'Male': 'male', 'Female': 'female', 'Both Sexes': 'both sex combined'}
+INCOME_COLUMNS = {column: field for field, column in INCOME_FIELDS.items()}
+# Numeric columns of the income dataset, in the order of the CSV (the correlation matrix)
+INCOME_NUMERIC = ['YEAR', 'Both Sexes', 'Male', 'Female']
+
+# Loader stamps: one document per collection with the hash of the file it was last loaded from
+VERSIONS_COLLECTION = 'dd_versions'
+
+# The version marker of a collection is checked again after this many seconds. The
+# query results below are cached per version (their first argument, from
+# collection_version), so a reload shows as soon as the marker changes
+VERSION_TTL = 30
+
+
+def use_mongo():
+    return DATA_SOURCE == 'mongo'
+
+
+# One pooled client per process, shared by every session and rerun
+@st.cache_resource
+def get_client():
+    # pymongo is only imported when the MongoDB source is actually used
+    from pymongo import MongoClient
+
+    return MongoClient(MONGO_URI, maxPoolSize=20)
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
+
+def aggregate(collection_name, pipeline):
+    with tracing.span(f'mongo/aggregate/{collection_name}') as span:
+        documents = list(get_db()[collection_name].aggregate(pipeline, allowDiskUse=True))
+        span.rows = len(documents)
+        return documents
+
+
+@st.cache_data(ttl=VERSION_TTL)
+def collection_stats(collection_name):
+    # Document count, newest _id and the loader's source hash: three small queries
+    # instead of fetching and hashing every document
+    db = get_db()
+    last = list(db[collection_name].find({}, {'_id': 1}).sort('_id', -1).limit(1))
+    stamp = db[VERSIONS_COLLECTION].find_one({'_id': collection_name}) or {}
+    return {
+        'count': db[collection_name].count_documents({}),
+        'last_id': str(last[0]['_id']) if last else None,
+        'source': stamp.get('source_sha256'),
+    }
+
+
+def collection_version(collection_name):
+    # Cheap version marker of a collection, part of the cached figures' keys
+    stats = collection_stats(collection_name)
+    return f"{stats['count']}-{stats['last_id']}-{(stats['source'] or '')[:16]}"
+
+
+@st.cache_data(max_entries=64)
+def income_page(version, number, size):
+    # Rows of page `number` (0-based) in insertion order; only that page crosses the wire
+    projection = {'_id': 0, **{field: 1 for field in INCOME_FIELDS}}
+    documents = get_db()[INCOME_COLLECTION].find({}, projection).sort('_id', 1).skip(number * size).limit(size)
+    return pd.DataFrame(list(documents), columns=list(INCOME_FIELDS)).rename(columns=INCOME_FIELDS)
+
+
+@st.cache_data(max_entries=8)
+def income_means(version, column):
+    # Mean of every measure per value of `column`, one column per measure (as cube.summarize)
+    group = {'_id': f'${INCOME_COLUMNS[column]}'}
+    group.update({measure: {'$avg': f'${field}'} for measure, field in INCOME_MEASURES.items()})
+    means = pd.DataFrame(aggregate(INCOME_COLLECTION, [{'$group': group}, {'$sort': {'_id': 1}}]))
+    return means.set_index('_id').rename_axis(column)[list(INCOME_MEASURES)]
+
+
+def _both_numbers(first, second):
+    return {'$and': [{'$isNumber': f'${first}'}, {'$isNumber': f'${second}'}]}
+
+
+@st.cache_data(max_entries=2)
+def income_correlation(version):
+    # The correlation matrix of the numeric columns from pairwise-complete sums
+    # computed on the server (see streaming.Moments)
+    fields = [INCOME_COLUMNS[column] for column in INCOME_NUMERIC]
+    group = {'_id': None}
+    for i, first in enumerate(fields):
+        for j, second in enumerate(fields):
+            both = _both_numbers(first, second)
+            group[f'n_{i}_{j}'] = {'$sum': {'$cond': [both, 1, 0]}}
+            group[f'sx_{i}_{j}'] = {'$sum': {'$cond': [both, f'${first}', 0]}}
+            group[f'sxx_{i}_{j}'] = {'$sum': {'$cond': [both, {'$multiply': [f'${first}', f'${first}']}, 0]}}
+            group[f'sxy_{i}_{j}'] = {'$sum': {'$cond': [both, {'$multiply': [f'${first}', f'${second}']}, 0]}}
+    sums = aggregate(INCOME_COLLECTION, [{'$group': group}])[0]
+
+    moments = Moments()
+    moments.columns = list(INCOME_NUMERIC)
+    size = len(fields)
+    for name in ('n', 'sx', 'sxx', 'sxy'):
+        setattr(moments, name, np.array([[float(sums[f'{name}_{i}_{j}']) for j in range(size)]
+                                         for i in range(size)]))
+    return moments.correlation()
+
+
+@st.cache_data(max_entries=2)
+def income_histograms(version):
+    # Binned counts of every measure per type of work and wage class, counted on
+    # the server: {(measure, group column, group value): Histogram}, the input of
+    # dd_core.distributions like streaming.frame_histograms
+    ranges = {'_id': None}
+    for measure, field in INCOME_MEASURES.items():
+        ranges[f'min {measure}'] = {'$min': f'${field}'}
+        ranges[f'max {measure}'] = {'$max': f'${field}'}
+    ranges = aggregate(INCOME_COLLECTION, [{'$group': ranges}])[0]
+
+    widths = {}
+    for measure in MEASURES:
+        low, high = ranges[f'min {measure}'], ranges[f'max {measure}']
+        if low is None:
+            continue
+        # Same resolution as the first chunk of Histogram.add
+        spread = float(high - low)
+        widths[measure] = spread / (MAX_BINS // 4) if spread > 0 else max(abs(float(low)), 1.0) / MAX_BINS
+
+    histograms = {}
+    for group_column in GROUPS:
+        facets = {}
+        for measure, width in widths.items():
+            field = INCOME_MEASURES[measure]
+            facets[measure] = [
+                {'$match': {'$expr': {'$isNumber': f'${field}'}}},
+                {'$group': {'_id': {'group': f'${INCOME_COLUMNS[group_column]}',
+                                    'bin': {'$floor': {'$divide': [f'${field}', width]}}},
+                            'count': {'$sum': 1}}},
+            ]
+        result = aggregate(INCOME_COLLECTION, [{'$facet': facets}])[0]
+        for measure, documents in result.items():
+            bins = {}
+            for doc in documents:
+                bins.setdefault(doc['_id']['group'], []).append((int(doc['_id']['bin']), doc['count']))
+            for group, counts in bins.items():
+                histograms[(measure, group_column, group)] = Histogram.from_bins(widths[measure], counts)
+    return histograms
+
+
+@st.cache_data(max_entries=2)
+def income_summaries(version):
+    # Sum and mean wages per education level, grouped on the server
+    group = {'_id': '$level of education'}
+    for column, field in INCOME_MEASURES.items():
+        group[f'sum {column}'] = {'$sum': f'${field}'}
+        group[f'mean {column}'] = {'$avg': f'${field}'}
+    summary = pd.DataFrame(aggregate(INCOME_COLLECTION, [{'$group': group}, {'$sort': {'_id': 1}}]))
+    summary = summary.set_index('_id').rename_axis('Education level')
+
+    columns = list(INCOME_MEASURES)
+    sum_data = summary[[f'sum {column}' for column in columns]].set_axis(columns, axis=1)
+    mean_data = summary[[f'mean {column}' for column in columns]].set_axis(columns, axis=1)
+    return sum_data, mean_data
+
+
+@st.cache_data(max_entries=8)
+def income_pivot(version, column):
+    # Same layout as pd.pivot_table(values=[column], index=['Education level'],
+    # columns=['Wages'], aggfunc={column: [max, np.mean]})
+    field = INCOME_MEASURES[column]
+    pipeline = [
+        {'$group': {
+            '_id': {'education': '$level of education', 'wages': '$wages'},
+            'max': {'$max': f'${field}'},
+            'mean': {'$avg': f'${field}'},
+        }},
+    ]
+    rows = [
+        {'Education level': doc['_id']['education'], 'Wages': doc['_id']['wages'],
+         'max': doc['max'], 'mean': doc['mean']}
+        for doc in aggregate(INCOME_COLLECTION, pipeline)
+    ]
+    pivot = pd.DataFrame(rows).pivot(index='Education level', columns='Wages', values=['max', 'mean'])
+    pivot.columns = pd.MultiIndex.from_tuples(
+        [(column, stat, wages) for stat, wages in pivot.columns], names=[None, None, 'Wages'])
+    return pivot.sort_index(axis=1)
+
+
+@st.cache_data(max_entries=2)
+def geographic_frame(version):
+    # Rebuild the wide Geography x level x year layout of the CSV, with the
+    # per-year values pushed together on the server
+    pipeline = [
+        {'$sort': {'year': 1}},
+        {'$group': {
+            '_id': {'region': '$region', 'level': '$education_level'},
+            'years': {'$push': {'year': '$year', 'percentage': '$percentage'}},
+        }},
+    ]
+    rows = []
+    for doc in aggregate(GEOGRAPHIC_COLLECTION, pipeline):
+        row = {'Geography': doc['_id']['region'], 'Educational attainment level': doc['_id']['level']}
+        row.update({str(item['year']): item['percentage'] for item in doc['years']})
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values(['Geography', 'Educational attainment level'], ignore_index=True)
+
+
+@st.cache_data(max_entries=2)
+def employment_frame(version):
+    documents = get_db()[EMPLOYMENT_COLLECTION].find({}, {'_id': 0, 'date': 1, 'employment': 1}).sort('date', 1)
+    df = pd.DataFrame(list(documents), columns=['date', 'employment'])
+    return df.rename(columns={'date': 'Date', 'employment': 'Ontario employment (x 1,000), seasonally adjusted'})
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from dd_core import datasets
+from dd_core.forecasts import EMPLOYMENT
+
+# The monthly labour-market indicators of reports 1, 4 and 5 (employment,
+# unemployment rates, CPI inflation and wage change) in one table: one row per
+# month on a sorted, gap-free monthly PeriodIndex and one column per indicator,
+# NaN where a report does not cover the month (report 5 starts in 2015). The
+# dates come from the typed datasets, parsed with each file's exact formats (see
+# dd_core.datasets). A range of months is found by binary search on the sorted
+# month ordinals, so a cross-indicator view or correlation is one slice instead
+# of a parse-filter-merge per report. The panel is shared read-only between
+# sessions.
+INDICATORS = {
+    'employment': [EMPLOYMENT],
+    'unemployment_rates': ['Unemployment_rate_Canada', 'Unemployment_rate_Ontario'],
+    'cpi_wage_change': ['CPI Inflation', 'Wage Change'],
+}
+
+
+def _month(value):
+    return value if isinstance(value, pd.Period) else pd.Period(value, freq='M')
+
+
+class MonthlyPanel:
+    def __init__(self, frame):
+        self.frame = frame
+        self._ordinals = frame.index.asi8
+
+    @classmethod
+    def from_frames(cls, frames):
+        # From {dataset: typed frame} of the datasets in INDICATORS
+        columns = []
+        for name, df in frames.items():
+            datasets.validate_months(name, df)
+            months = pd.PeriodIndex(df[datasets.DATASETS[name]['monthly']['date']], freq='M')
+            columns.append(df[INDICATORS[name]].set_axis(months))
+        frame = pd.concat(columns, axis=1, join='outer').sort_index()
+        months = pd.period_range(frame.index[0], frame.index[-1], freq='M', name='Month')
+        return cls(frame.reindex(months).astype('float64'))
+
+    @property
+    def months(self):
+        return self.frame.index
+
+    @property
+    def indicators(self):
+        return list(self.frame.columns)
+
+    def _bounds(self, start, end):
+        first = 0 if start is None else np.searchsorted(self._ordinals, _month(start).ordinal, side='left')
+        last = len(self._ordinals) if end is None else np.searchsorted(self._ordinals, _month(end).ordinal,
+                                                                        side='right')
+        return first, last
+
+    def range(self, start=None, end=None, columns=None):
+        # Months start..end (inclusive; e.g. '2018-01', '2023-06') of the given indicators, or of all
+        first, last = self._bounds(start, end)
+        frame = self.frame.iloc[first:last]
+        return frame if columns is None else frame[list(columns)]
+
+    def table(self, start=None, end=None, columns=None, date='Date'):
+        # The same months as a frame with a `date` column (first day of each month), the
+        # layout of the report CSVs; months without any of the indicators are left out
+        frame = self.range(start, end, columns).dropna(how='all')
+        return frame.set_axis(frame.index.to_timestamp()).rename_axis(date).reset_index()
+
+    def correlation(self, start=None, end=None, columns=None):
+        # Pairwise-complete correlation of the indicators over the months
+        return self.range(start, end, columns).corr()
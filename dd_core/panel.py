@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+# The m3 dataset as a dense NumPy panel: values[geography, attainment level, year].
+# Built once per data version; a geography's block is a view found through a
+# dict lookup, so selecting a state no longer scans the rows, and comparisons
+# across all geographies are single array operations. The panel is shared
+# read-only between sessions (the arrays are not writeable).
+GEOGRAPHY = 'Geography'
+LEVEL = 'Educational attainment level'
+
+
+class AttainmentPanel:
+    def __init__(self, geographies, levels, years, values):
+        self.geographies = list(geographies)
+        self.levels = list(levels)
+        self.years = list(years)
+        self.values = values
+        self.values.flags.writeable = False
+        self._geography_index = {name: i for i, name in enumerate(self.geographies)}
+        self._level_index = {name: i for i, name in enumerate(self.levels)}
+
+    @classmethod
+    def from_frame(cls, df):
+        # Year columns are all columns after Geography and the attainment level
+        years = [column for column in df.columns if column not in (GEOGRAPHY, LEVEL)]
+        geography_codes, geographies = pd.factorize(df[GEOGRAPHY])
+        level_codes, levels = pd.factorize(df[LEVEL])
+        values = np.full((len(geographies), len(levels), len(years)), np.nan)
+        values[geography_codes, level_codes] = df[years].to_numpy(dtype='float64')
+        return cls(geographies, levels, years, values)
+
+    def state(self, geography, levels=None):
+        # (levels x years) block of one geography; a view when `levels` is None,
+        # else the given levels in order, with NaN rows for levels not in the data
+        block = self.values[self._geography_index[geography]]
+        if levels is None:
+            return block
+        rows = np.full((len(levels), len(self.years)), np.nan)
+        for i, level in enumerate(levels):
+            if level in self._level_index:
+                rows[i] = block[self._level_index[level]]
+        return rows
+
+    def level(self, level):
+        # (geographies x years) figures of one attainment level, e.g. to compare all geographies
+        return pd.DataFrame(self.values[:, self._level_index[level]], index=pd.Index(self.geographies, name=GEOGRAPHY),
+                            columns=self.years)
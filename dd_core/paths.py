@@ -0,0 +1,14 @@
+import os
+
+# Repository root, so the helpers work no matter which directory the app is started from
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTENT_DIR = os.path.join(ROOT_DIR, 'content')
+
+# Everything derived from the raw data (fitted models, converted tables, ...) lives here
+CACHE_DIR = os.environ.get('DD_CACHE_DIR', os.path.join(ROOT_DIR, '.cache'))
+
+
+def cache_path(*parts):
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from cachetools import LRUCache
+
+from dd_core import artifacts, backtest, clustering, cube, datasets, distributions, forecasts, mongo, streaming, tracing
+
+# Expensive results computed off the request path. scripts/precompute.py runs the
+# jobs below whenever their inputs change and publishes the results as versioned
+# artifacts; the pages call `served(job)` or `result(job)`, which serve the
+# published artifact. Until the worker has caught up with a data change, the last
+# published version is served and the job is recomputed in a background thread of
+# the server, one run per job at a time however many sessions ask; a job that was
+# never published raises Pending, which the page sections show as a notice. With
+# DD_PRECOMPUTE_INLINE=1 (the static export) a missing result is computed inline.
+EMPLOYMENT = 'employment'
+GEOGRAPHIC = 'geographic_education_distribution'
+INCOME = 'income_levels_by_education'
+
+# Bump when a job's computation changes, so already published artifacts go stale
+REVISION = 4
+
+# A background run of a job that failed is not retried for this many seconds
+RETRY_SECONDS = 60
+
+# Results computed inline while no matching artifact was published
+_inline = LRUCache(maxsize=32)
+# Jobs being computed in the background, and when a background run last failed
+_running = set()
+_failed = {}
+_lock = threading.Lock()
+
+
+class Pending(Exception):
+    # No version of the job's artifact has been published yet
+    def __init__(self, job):
+        super().__init__(f'{job} is being computed; it is shown once it is ready.')
+        self.job = job
+
+
+def load_input(name):
+    # The same data the pages read: MongoDB when DD_DATA_SOURCE=mongo, else the typed CSV
+    if mongo.use_mongo():
+        if name == EMPLOYMENT:
+            return mongo.employment_frame(mongo.collection_version(mongo.EMPLOYMENT_COLLECTION))
+        if name == GEOGRAPHIC:
+            return mongo.geographic_frame(mongo.collection_version(mongo.GEOGRAPHIC_COLLECTION))
+    if name == INCOME and streaming.use_streaming(name):
+        # Too large to load; the income jobs read the cube, which is built chunk by chunk
+        return None
+    return datasets.load(name)
+
+
+def input_version(name):
+    if mongo.use_mongo() and name in (EMPLOYMENT, GEOGRAPHIC):
+        return datasets.frame_fingerprint(load_input(name))
+    return datasets.source_version(name)
+
+
+def refresh_inputs():
+    # Check the MongoDB version markers again, so the next versions reflect the collections as they are now
+    if mongo.use_mongo():
+        mongo.collection_stats.clear()
+
+
+# Jobs; each takes its input frames in the order of its 'inputs'
+
+def employment_forecast_6(employment):
+    return forecasts.employment_forecast(forecasts.employment_series(employment), periods=6, steps=6)
+
+
+def employment_forecast_36(employment):
+    return forecasts.employment_forecast(forecasts.employment_series(employment), periods=12, steps=36)
+
+
+def employment_decomposition(employment):
+    return forecasts.seasonal_decomposition(forecasts.employment_series(employment))
+
+
+def employment_backtest(employment, workers=None):
+    # MAE/MAPE per forecast step of the candidate orders, from expanding-window origins
+    series = forecasts.employment_series(employment)
+    errors = backtest.backtest_many({('employment', series.name): series}, orders=forecasts.BACKTEST_ORDERS,
+                                    workers=workers)
+    return backtest.accuracy(errors)
+
+
+def series_backtests(industries, occupations, unemployment, workers=None):
+    # The same for every industry, occupation and unemployment series with ARIMA(1,1,1);
+    # series shorter than the first training window are left out
+    frames = {'industry_employment': industries, 'occupation_employment': occupations,
+              'unemployment_rates': unemployment}
+    return backtest.accuracy(backtest.backtest_many(forecasts.collect_series(frames), workers=workers))
+
+
+def state_clusters(geographic):
+    # The m3 page's 3 clusters, and the number of clusters the silhouette scores would pick
+    return {
+        'fixed': clustering.cluster_geographies(geographic, k=3),
+        'auto': clustering.cluster_geographies(geographic),
+    }
+
+
+def series_forecasts(industries, occupations, unemployment, workers=None):
+    # 12-month forecasts of every industry, occupation and unemployment series, order chosen by AIC
+    frames = {'industry_employment': industries, 'occupation_employment': occupations,
+              'unemployment_rates': unemployment}
+    return forecasts.forecast_many(forecasts.collect_series(frames), steps=12, orders=forecasts.ORDER_GRID,
+                                   workers=workers)
+
+
+def income_pivots(income):
+    cube.refresh_cube()
+    cells = cube.load_cube()
+    return {measure: cube.pivot(cells, measure) for measure in cube.MEASURES}
+
+
+def income_distributions(income):
+    # KDE and ECDF curves of every measure per type of work and wage class; in
+    # streaming mode from the binned counts folded from the CSV
+    if income is None:
+        return distributions.grids(streaming.summary(INCOME)['histograms'])
+    return distributions.grids(streaming.frame_histograms(income))
+
+
+# 'parallel' jobs fit their models in a process pool of their own and take its size as `workers`
+JOBS = {
+    'employment_forecast_6': {'inputs': [EMPLOYMENT], 'compute': employment_forecast_6},
+    'employment_forecast_36': {'inputs': [EMPLOYMENT], 'compute': employment_forecast_36},
+    'employment_decomposition': {'inputs': [EMPLOYMENT], 'compute': employment_decomposition},
+    'series_forecasts': {'inputs': ['industry_employment', 'occupation_employment', 'unemployment_rates'],
+                         'compute': series_forecasts, 'parallel': True},
+    'employment_backtest': {'inputs': [EMPLOYMENT], 'compute': employment_backtest, 'parallel': True},
+    'series_backtests': {'inputs': ['industry_employment', 'occupation_employment', 'unemployment_rates'],
+                         'compute': series_backtests, 'parallel': True},
+    'state_clusters': {'inputs': [GEOGRAPHIC], 'compute': state_clusters},
+    'income_pivots': {'inputs': [INCOME], 'compute': income_pivots},
+    'income_distributions': {'inputs': [INCOME], 'compute': income_distributions},
+}
+
+
+def job_version(job):
+    versions = [input_version(name) for name in JOBS[job]['inputs']]
+    payload = json.dumps([job, REVISION, versions])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def compute(job, workers=None):
+    inputs = [load_input(name) for name in JOBS[job]['inputs']]
+    if JOBS[job].get('parallel'):
+        return JOBS[job]['compute'](*inputs, workers=workers)
+    return JOBS[job]['compute'](*inputs)
+
+
+def run_job(job, workers=None):
+    # Compute and publish one job; runs in the worker's process pool, or (parallel jobs) in the worker itself
+    version = job_version(job)
+    start = time.perf_counter()
+    value = compute(job, workers)
+    seconds = time.perf_counter() - start
+    artifacts.publish(job, version, value, seconds=seconds)
+    return job, version, seconds
+
+
+def stale_jobs(jobs=None):
+    # Jobs whose published artifact was not computed from the current inputs
+    stale = []
+    for job in jobs or JOBS:
+        pointer = artifacts.current(job)
+        if pointer is None or pointer['version'] != job_version(job):
+            stale.append(job)
+    return stale
+
+
+def compute_inline():
+    return os.environ.get('DD_PRECOMPUTE_INLINE') == '1'
+
+
+def _run_in_background(job):
+    try:
+        run_job(job)
+    except Exception as error:
+        print(f'{job}: background run failed: {error!r}', flush=True)
+        with _lock:
+            _failed[job] = time.monotonic()
+    finally:
+        with _lock:
+            _running.discard(job)
+
+
+def refresh(job):
+    # Start computing the job's current version in a background thread, unless it is
+    # already running or failed less than RETRY_SECONDS ago
+    with _lock:
+        if job in _running or time.monotonic() - _failed.get(job, -RETRY_SECONDS) < RETRY_SECONDS:
+            return False
+        _running.add(job)
+    threading.Thread(target=_run_in_background, args=(job,), name=f'precompute-{job}', daemon=True).start()
+    return True
+
+
+def served(job):
+    # (version, value) of the job's result; the version is the job_version the value
+    # was computed from, for the keys of anything cached from it
+    version = job_version(job)
+    with tracing.span(f'precompute/{job}') as span:
+        published = artifacts.latest(job)
+        if published is not None and published[0] == version:
+            span.cache = 'artifact'
+            return published
+        if compute_inline():
+            key = (job, version)
+            with _lock:
+                value = _inline.get(key)
+            span.cache = 'memory' if value is not None else 'miss'
+            if value is None:
+                value = compute(job)
+                with _lock:
+                    _inline[key] = value
+            return version, value
+        refresh(job)
+        if published is None:
+            span.cache = 'pending'
+            raise Pending(job)
+        span.cache = 'stale'
+        return published
+
+
+def result(job):
+    return served(job)[1]
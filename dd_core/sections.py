@@ -0,0 +1,45 @@
+import streamlit as st
+
+from dd_core import precompute, tracing
+
+# Long pages are split into sections that only execute when they are open. Each
+# section has a toggle under its heading, and the sidebar contents open a section
+# when clicked. Closed sections cost nothing on a rerun; open ones still serve
+# their heavy results from the data, model and figure caches. A section whose
+# precomputed result was never published shows a notice until it is.
+
+
+def _state_key(title):
+    return f'dd_section_{title}'
+
+
+def open_section(title):
+    st.session_state[_state_key(title)] = True
+
+
+def is_open(title):
+    return bool(st.session_state.get(_state_key(title)))
+
+
+def sidebar_contents(titles):
+    st.sidebar.header('Contents Overview:')
+    for title in titles:
+        st.sidebar.button(title, key=f'dd_nav_{title}', on_click=open_section, args=(title,),
+                          use_container_width=True)
+
+
+def timed(title):
+    # Tracing span of a page section (see dd_core.tracing)
+    return tracing.span(f'section/{title}')
+
+
+def section(title, render, expanded=False):
+    key = _state_key(title)
+    st.session_state.setdefault(key, expanded)
+    st.subheader(title)
+    if st.toggle('Show section', key=key):
+        with timed(title):
+            try:
+                render()
+            except precompute.Pending as pending:
+                st.info(str(pending))
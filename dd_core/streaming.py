@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from dd_core import artifacts, datasets, tracing
+
+# Streaming mode of the m1 page, for income extracts too large to load. The CSV
+# is read CHUNK_ROWS rows at a time and every chunk is folded into what the page
+# shows: the aggregate cube (dd_core/cube.py builds it the same way), the
+# moments behind the correlation matrix, binned counts of every measure per
+# group for the density and ECDF plots, and a uniform sample of rows for the
+# raw-data preview. Peak memory is bounded by the chunk size and the number of
+# bins, not by the size of the file. The folded summary is published as an
+# artifact per source version, so the pass over the file runs once (on the
+# first view, or ahead of it with scripts/build_cube.py).
+DATASET = 'income_levels_by_education'
+CHUNK_ROWS = 100_000
+# Files larger than this are streamed; DD_STREAMING=1/0 forces the mode on or off
+STREAMING_BYTES = 256 * 1024 * 1024
+SAMPLE_ROWS = 1_000
+MAX_BINS = 2_048
+RANDOM_STATE = 42
+
+MEASURES = ['Both Sexes', 'Male', 'Female']
+# Columns the distribution plots split the measures by
+GROUPS = ['Type of work', 'Wages']
+
+_memory = LRUCache(maxsize=4)
+_lock = threading.Lock()
+
+
+def use_streaming(name=DATASET):
+    setting = os.environ.get('DD_STREAMING')
+    if setting in ('0', '1'):
+        return setting == '1'
+    return os.path.getsize(datasets.source_path(name)) > STREAMING_BYTES
+
+
+class Histogram:
+    # Counts of values in bins of equal width, aligned at 0 (bin k holds
+    # [k * width, (k + 1) * width)). When new values would need more than
+    # MAX_BINS bins, pairs of bins are merged and the width doubles, so any
+    # stream of values fits in a bounded array.
+    __slots__ = ('width', 'start', 'counts')
+
+    def __init__(self):
+        self.width = None
+        self.start = 0
+        self.counts = np.zeros(0)
+
+    @classmethod
+    def from_bins(cls, width, counts):
+        # From (bin, count) pairs counted elsewhere (e.g. by MongoDB), bins of `width`
+        histogram = cls()
+        bins = np.array([bin for bin, _ in counts], dtype=np.int64)
+        histogram.width, histogram.start = width, int(bins.min())
+        histogram.counts = np.bincount(bins - histogram.start, weights=[count for _, count in counts])
+        while len(histogram.counts) > MAX_BINS:
+            histogram._coarsen()
+        return histogram
+
+    def add(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        if self.width is None:
+            # A quarter of the bins for the first chunk's range leaves room to grow before coarsening
+            spread = float(values.max() - values.min())
+            self.width = spread / (MAX_BINS // 4) if spread > 0 else max(abs(float(values[0])), 1.0) / MAX_BINS
+        bins = np.floor(values / self.width).astype(np.int64)
+        while True:
+            low = min(int(bins.min()), self.start) if len(self.counts) else int(bins.min())
+            high = max(int(bins.max()), self.start + len(self.counts) - 1) if len(self.counts) else int(bins.max())
+            if high - low < MAX_BINS:
+                break
+            self._coarsen()
+            bins //= 2
+        counts = np.bincount(bins - low, minlength=high - low + 1).astype('float64')
+        counts[self.start - low:self.start - low + len(self.counts)] += self.counts
+        self.start, self.counts = low, counts
+
+    def _coarsen(self):
+        bins = np.arange(self.start, self.start + len(self.counts)) // 2
+        start = self.start // 2
+        self.counts = np.bincount(bins - start, weights=self.counts)
+        self.start, self.width = start, self.width * 2
+
+    @property
+    def centers(self):
+        return (np.arange(self.start, self.start + len(self.counts)) + 0.5) * (self.width or 0)
+
+    @property
+    def total(self):
+        return float(self.counts.sum())
+
+
+class Moments:
+    # Pairwise-complete sums of the numeric columns, enough for the same
+    # correlation matrix DataFrame.corr() gives on all rows
+    def __init__(self):
+        self.columns = None
+        self.n = self.sx = self.sxx = self.sxy = None
+
+    def add(self, numeric):
+        present = numeric.notna().to_numpy(dtype='float64')
+        values = numeric.fillna(0).to_numpy(dtype='float64')
+        if self.columns is None:
+            size = (numeric.shape[1], numeric.shape[1])
+            self.columns = list(numeric.columns)
+            self.n, self.sx, self.sxx, self.sxy = (np.zeros(size) for _ in range(4))
+        # [i, j]: over the rows where both column i and column j are present
+        self.n += present.T @ present
+        self.sx += values.T @ present
+        self.sxx += (values ** 2).T @ present
+        self.sxy += values.T @ values
+
+    def correlation(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = self.n * self.sxy - self.sx * self.sx.T
+            variance = self.n * self.sxx - self.sx ** 2
+            correlation = covariance / np.sqrt(variance * variance.T)
+        return pd.DataFrame(correlation, index=self.columns, columns=self.columns)
+
+
+def add_histograms(histograms, df):
+    # Add the measures of `df` to {(measure, group column, group value): Histogram}
+    for group_column in GROUPS:
+        for group, values in df.groupby(group_column, sort=False, observed=True)[MEASURES]:
+            for measure in MEASURES:
+                histograms.setdefault((measure, group_column, group), Histogram()).add(values[measure])
+    return histograms
+
+
+def frame_histograms(df):
+    # The same binned counts for a frame that is already loaded
+    return add_histograms({}, df)
+
+
+def _sample(sample, chunk, rng):
+    # Bottom-k sampling: every row gets a random key and the SAMPLE_ROWS smallest
+    # keys are kept, which is a uniform sample of all rows seen so far
+    chunk = chunk.assign(_key=rng.random(len(chunk)))
+    rows = chunk if sample is None else pd.concat([sample, chunk])
+    return rows.nsmallest(SAMPLE_ROWS, '_key')
+
+
+def fold(name=DATASET, chunk_rows=CHUNK_ROWS):
+    # One pass over the CSV; returns {'rows', 'correlation', 'histograms', 'sample'},
+    # with the histograms keyed by (measure, group column, group value)
+    rng = np.random.default_rng(RANDOM_STATE)
+    rows, moments, histograms, sample = 0, Moments(), {}, None
+    with tracing.span(f'streaming/fold/{name}') as span:
+        for chunk in datasets.read_chunks(name, chunk_rows):
+            # Position of the rows in the file, kept by the sample
+            chunk.index = pd.RangeIndex(rows, rows + len(chunk))
+            rows += len(chunk)
+            moments.add(chunk.select_dtypes(include=[np.number]))
+            add_histograms(histograms, chunk)
+            sample = _sample(sample, chunk, rng)
+        span.rows = rows
+    sample = sample.sort_index().drop(columns='_key') if sample is not None else pd.DataFrame()
+    return {'rows': rows, 'correlation': moments.correlation(), 'histograms': histograms, 'sample': sample}
+
+
+def summary(name=DATASET):
+    # The folded summary of the current CSV, published as an artifact so it is
+    # computed once per source version
+    version = datasets.source_version(name)
+    key = (name, version)
+    with _lock:
+        value = _memory.get(key)
+    if value is not None:
+        return value
+    artifact = f'stream_{name}'
+    value = artifacts.load(artifact, version)
+    if value is None:
+        start = time.perf_counter()
+        value = fold(name)
+        artifacts.publish(artifact, version, value, seconds=time.perf_counter() - start)
+    with _lock:
+        _memory[key] = value
+    return value
+
+
+def page(name, number, size):
+    # Rows of page `number` (0-based) of the raw CSV; only that page is parsed
+    return datasets.read_rows(name, number * size, size)
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+# Named spans around the hot paths (CSV parsing, model fits, clustering, figure
+# rendering, page sections). A span records its duration, the rows it processed
+# and whether it was served from a cache; the process keeps one aggregate per
+# span name, shown on the dashboard's admin view (dd_dashboard.py?admin=1).
+#
+# Tracing is off unless DD_TRACING=1. A disabled span is one shared no-op object,
+# so instrumented code pays a function call and nothing else.
+ENABLED = os.environ.get('DD_TRACING', '').lower() in ('1', 'true', 'yes')
+
+_metrics = {}
+_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ('name', 'rows', 'cache', '_start')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        # Set by the traced code: rows processed, and 'hit', 'miss' or the name of
+        # the cache tier that served the result
+        self.rows = rows
+        self.cache = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self, time.perf_counter() - self._start, exc_type is not None)
+        return False
+
+
+class _DisabledSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_DISABLED = _DisabledSpan()
+
+
+def span(name, rows=None):
+    if not ENABLED:
+        return _DISABLED
+    return Span(name, rows)
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def _record(span, seconds, failed):
+    with _lock:
+        entry = _metrics.get(span.name)
+        if entry is None:
+            entry = _metrics[span.name] = {
+                'count': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'cache': {},
+            }
+        entry['count'] += 1
+        entry['errors'] += failed
+        entry['total_seconds'] += seconds
+        entry['max_seconds'] = max(entry['max_seconds'], seconds)
+        if span.rows is not None:
+            entry['rows'] += int(span.rows)
+        if span.cache is not None:
+            entry['cache'][span.cache] = entry['cache'].get(span.cache, 0) + 1
+
+
+def snapshot():
+    # One row per span name, slowest total first
+    with _lock:
+        entries = [(name, dict(entry, cache=dict(entry['cache']))) for name, entry in _metrics.items()]
+    rows = []
+    for name, entry in entries:
+        cache = entry.pop('cache')
+        lookups = sum(cache.values())
+        misses = cache.get('miss', 0)
+        rows.append(dict(
+            name=name,
+            **entry,
+            mean_seconds=entry['total_seconds'] / entry['count'],
+            cache_hits=lookups - misses,
+            cache_misses=misses,
+            cache_hit_rate=(lookups - misses) / lookups if lookups else None,
+        ))
+    return sorted(rows, key=lambda row: row['total_seconds'], reverse=True)
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
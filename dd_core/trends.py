@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Closed-form least-squares line fits for every group of a long-format frame in
+# one NumPy pass (bincount sums over group codes) instead of one np.polyfit call
+# per group.
+
+
+def linear_trends(df, by, y, x=None):
+    # Fit y = intercept + slope * x per group of `by` (a column or list of columns).
+    # Without `x` the position of the row inside its group is used, the same as
+    # np.polyfit(range(len(group)), group[y], 1). Rows with a missing y are skipped.
+    # Returns one row per group with slope, intercept, r2, stderr (of the slope),
+    # n and the group maximum of y.
+    keys = [by] if isinstance(by, str) else list(by)
+    df = df[df[y].notna()]
+    grouped = df.groupby(keys, sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    index = grouped.size().index
+    groups = len(index)
+
+    if x is None:
+        xs = grouped.cumcount().to_numpy(dtype='float64')
+    elif pd.api.types.is_datetime64_any_dtype(df[x]):
+        xs = df[x].to_numpy('datetime64[D]').astype('float64')
+    else:
+        xs = df[x].to_numpy(dtype='float64')
+    ys = df[y].to_numpy(dtype='float64')
+
+    def group_sum(values):
+        return np.bincount(codes, weights=values, minlength=groups)
+
+    n = np.bincount(codes, minlength=groups).astype('float64')
+    mean_x = group_sum(xs) / n
+    mean_y = group_sum(ys) / n
+    # Centre on the group means before squaring, for numerical stability
+    dx = xs - mean_x[codes]
+    dy = ys - mean_y[codes]
+    sxx = group_sum(dx * dx)
+    sxy = group_sum(dx * dy)
+    syy = group_sum(dy * dy)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+        sse = np.maximum(syy - slope * sxy, 0.0)
+        r2 = np.where(syy > 0, 1.0 - sse / syy, np.nan)
+        stderr = np.where(n > 2, np.sqrt(sse / (n - 2) / sxx), np.nan)
+
+    group_max = np.full(groups, -np.inf)
+    np.maximum.at(group_max, codes, ys)
+
+    return pd.DataFrame({
+        'slope': slope,
+        'intercept': intercept,
+        'r2': r2,
+        'stderr': stderr,
+        'n': n.astype('int64'),
+        'max': group_max,
+    }, index=index)
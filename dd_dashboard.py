@@ -1,44 +1,64 @@
-import streamlit as st
-
-# Set the page configuration to allow wide mode
-st.set_page_config(
-    page_title="Education and the Mismatch in the Labor Market",
-    page_icon=":mortar_board:",
-    layout="wide"
-)
-
-# Define the URLs for the modules
-modules = {
-    "Income Levels by Education": "https://dddemo-m1-income-levels-by-education.streamlit.app",
-    "Employment Trends and Insights": "https://dddemo-m2-employment-trends-and-insights.streamlit.app",
-    "Geographic Education Distribution": "https://dddemo-m3-geographic-education-distribution.streamlit.app"
-}
-
-# Custom CSS for sidebar
-st.markdown("""
-    <style>
-        .css-18e3th9 {
-            font-size: 24px; /* Adjust the font size as needed */
-            font-weight: bold;
-        }
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Sidebar for navigation
-st.sidebar.image("graphics/dd_logo.png", use_column_width=True)  # Display the logo in the sidebar
-st.sidebar.title("Dashboard")
-selection = st.sidebar.radio("Go to module:", list(modules.keys()))
-
-# Main section
-st.title("Education and the Mismatch in the Labor Market: Considerations for Improving Job-Skill Alignment")
-
-# Display content based on selection
-if selection in modules:
-    st.subheader(f"Module: {selection}")
-    st.markdown(f'Click [here]({modules[selection]}) to view the {selection} module.', unsafe_allow_html=True)
-
-# Footer section
-st.markdown("---")
-st.markdown("### Group Name : Data Dynamos")
-st.markdown("&copy; 2024 Summer (Dr. Shafaq Khan) Advanced Database Topics, All rights reserved.")
+import json
+
+import pandas as pd
+import streamlit as st
+
+from dd_core import tracing
+
+# Set the page configuration to allow wide mode
+st.set_page_config(
+    page_title="Education and the Mismatch in the Labor Market",
+    page_icon=":mortar_board:",
+    layout="wide"
+)
+
+# Hidden admin view (dd_dashboard.py?admin=1): the tracing spans aggregated by this
+# process across all pages and sessions
+if st.query_params.get("admin") == "1":
+    st.title("Tracing Metrics")
+    if not tracing.ENABLED:
+        st.info("Tracing is disabled; start the app with DD_TRACING=1 to collect spans.")
+    metrics = tracing.snapshot()
+    st.dataframe(pd.DataFrame(metrics), use_container_width=True, hide_index=True)
+    st.download_button("Download as JSON", json.dumps(metrics, indent=2), file_name="dd_metrics.json",
+                       mime="application/json")
+    if st.button("Reset metrics"):
+        tracing.reset()
+        st.rerun()
+    st.stop()
+
+# Define the pages for the modules; they all run in this app's process and share its caches
+modules = {
+    "Income Levels by Education": "pages/1_Income_Levels_by_Education.py",
+    "Employment Trends and Insights": "pages/2_Employment_Trends_and_Insights.py",
+    "Geographic Education Distribution": "pages/3_Geographic_Education_Distribution.py"
+}
+
+# Custom CSS for sidebar
+st.markdown("""
+    <style>
+        .css-18e3th9 {
+            font-size: 24px; /* Adjust the font size as needed */
+            font-weight: bold;
+        }
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# Sidebar for navigation
+st.sidebar.image("graphics/dd_logo.png", use_column_width=True)  # Display the logo in the sidebar
+st.sidebar.title("Dashboard")
+selection = st.sidebar.radio("Go to module:", list(modules.keys()))
+
+# Main section
+st.title("Education and the Mismatch in the Labor Market: Considerations for Improving Job-Skill Alignment")
+
+# Display content based on selection
+if selection in modules:
+    st.subheader(f"Module: {selection}")
+    st.page_link(modules[selection], label=f'Open the {selection} module')
+
+# Footer section
+st.markdown("---")
+st.markdown("### Group Name : Data Dynamos")
+st.markdown("&copy; 2024 Summer (Dr. Shafaq Khan) Advanced Database Topics, All rights reserved.")
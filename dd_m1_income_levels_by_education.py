@@ -1,121 +1,236 @@
 import streamlit as st
 import numpy as np
 import seaborn as sns
-import pandas as pd
 import matplotlib.pyplot as plt
 
-st.set_option('deprecation.showPyplotGlobalUse', False)
-# Load the dataset with caching for efficiency
-@st.cache_data
-def load_data():
-    return pd.read_csv('content/dd_m1_income_levels_by_education.csv')
-
-data = load_data()
-
-# Load and display an image (e.g., a logo) in the sidebar
-logo_path = 'graphics/dd_logo.png'
-st.sidebar.image(logo_path, use_column_width=True)
-
-# Add Contents Overview in the sidebar
-st.sidebar.header('Contents Overview:')
-st.sidebar.markdown("""
-  - [Sum of wages by education level](#sum-of-wages-by-education-level)
-  - [Mean wages by education level](#mean-wages-by-education-level)
-  - [Bar plot of mean wages by education level](#bar-plot-of-mean-wages-by-education-level)
-  - [Density plot of wages by type of work](#density-plot-of-wages-by-type-of-work)
-  - [Density plot of wages by type of work for Male](#density-plot-of-wages-by-type-of-work-for-male)
-  - [Density plot of wages by type of work for Female](#density-plot-of-wages-by-type-of-work-for-female)
-  - [Distribute Wages data into all available classes](#distribute-wages-data-into-all-available-classes)
-  - [Bar plot of wages by age group](#bar-plot-of-wages-by-age-group)
-  - [Correlation matrix](#correlation-matrix)
-  - [Bar plot of mean wages by education level from pivot table](#bar-plot-of-mean-wages-by-education-level-from-pivot-table)
-  - [Conclusion](#conclusion)
-""")
-
-st.title("Analyzing Wage Disparities by Education Level in Canada") 
-
-# Display the raw data
-st.write(data)
-
-# Grouping and summarizing data
-grouped_data = data.groupby('Education level')[['  Male', '  Female', 'Both Sexes']]
-sum_data = grouped_data.sum()
-mean_data = grouped_data.mean()
-
-# Display data summaries
-st.subheader('Sum of wages by education level')
-st.write(sum_data)
-
-st.subheader('Mean wages by education level')
-st.write(mean_data)
-
-# Plotting
-st.subheader('Bar plot of mean wages by education level')
-fig, ax = plt.subplots()
-sns.barplot(x='Both Sexes', y='Education level', color='blue', data=data, ax=ax)
-st.pyplot(fig)
-
-st.subheader('Density plot of wages by type of work')
-sns.displot(data=data, x='Both Sexes', hue='Type of work', kind='kde')
-st.pyplot()
-
-st.subheader('Density plot of wages by type of work for Male')
-sns.displot(data=data, x='  Male', hue='Type of work', kind='kde')
-st.pyplot()
-
-st.subheader('Density plot of wages by type of work For Female')
-sns.displot(data=data, x='  Female', hue='Type of work', kind='kde')
-st.pyplot()
-
-st.subheader('Distribute Wages data into all available classes')
-sns.displot(data=data, x='Both Sexes', hue= 'Wages', kind = 'ecdf')
-st.pyplot()
-sns.displot(data=data, x='  Male', hue= 'Wages', kind = 'ecdf')
-st.pyplot()
-sns.displot(data=data, x='  Female', hue= 'Wages', kind = 'ecdf')
-st.pyplot()
-
-st.subheader('Bar plot of wages by age group')
-sns.barplot(x='Both Sexes', y='Age group', data=data,palette='viridis')
-st.pyplot()
-sns.barplot(x='  Male', y='Age group', data=data,palette='viridis')
-st.pyplot()
-sns.barplot(x='  Female', y='Age group', data=data,palette='viridis')
-st.pyplot()
-
-# Correlation matrix
-numeric_data = data.select_dtypes(include=[np.number])
-corr_matrix = numeric_data.corr()
-st.subheader('Correlation matrix')
-st.write(corr_matrix)
-
-# Pivot tables
-piv = pd.pivot_table(data, values=['Both Sexes'], index=['Education level'], columns=['Wages'], aggfunc={'Both Sexes': [max, np.mean]})
-pivM = pd.pivot_table(data, values=['  Male'], index=['Education level'], columns=['Wages'], aggfunc={'  Male': [max, np.mean]})
-pivF = pd.pivot_table(data, values=['  Female'], index=['Education level'], columns=['Wages'], aggfunc={'  Female': [max, np.mean]})
+from dd_core import cube, datasets, figures, mongo, precompute, sections, streaming
+from dd_core.distributions import grids
+
+DATASET = 'income_levels_by_education'
+# Rows per page of the raw-data preview in streaming mode
+PAGE_ROWS = 100
+
+# Load the typed dataset once per version (the version invalidates the cache when the CSV changes); one
+# read-only instance is shared by all sections and sessions, so it must not be modified
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    return datasets.load(DATASET)
+
+# Precomputed aggregate cube (see scripts/build_cube.py); the summaries and pivot tables are sliced from it
+@st.cache_resource(max_entries=2)
+def load_cube(version):
+    return cube.load_cube()
+
+def income_data():
+    # The rows of the CSV; with DD_DATA_SOURCE=mongo the sections aggregate on the server
+    # instead, so the documents never cross the wire as a whole (see dd_core.mongo)
+    return load_data(datasets.source_version(DATASET))
+
+def streaming_mode():
+    # Extracts too large to load are folded chunk by chunk instead (see dd_core.streaming)
+    return not mongo.use_mongo() and streaming.use_streaming(DATASET)
+
+def data_version():
+    # Version of the data, part of every cached figure's key
+    if mongo.use_mongo():
+        return mongo.collection_version(mongo.INCOME_COLLECTION)
+    return datasets.source_version(DATASET)
+
+def summaries():
+    # Grouping and summarizing data
+    if mongo.use_mongo():
+        return mongo.income_summaries(data_version())
+    income_cube = load_cube(datasets.source_version(DATASET))
+    return cube.summarize(income_cube, 'Education level')
+
+def pivots():
+    # Pivot tables, and the version they were computed from for the figure keys
+    if mongo.use_mongo():
+        version = data_version()
+        return version, (mongo.income_pivot(version, 'Both Sexes'), mongo.income_pivot(version, 'Male'),
+                         mongo.income_pivot(version, 'Female'))
+    # Precomputed off the request path (see dd_core.precompute)
+    version, piv = precompute.served('income_pivots')
+    return version, (piv['Both Sexes'], piv['Male'], piv['Female'])
+
+# Figure builders; they only run when the figure cache misses
+
+def mean_wages_barplot(data):
+    fig, ax = plt.subplots()
+    sns.barplot(x='Both Sexes', y='Education level', color='blue', data=data, ax=ax)
+    return fig
+
+def distribution_figure(curves, x, hue, kind):
+    # Draws the precomputed curves of every group; the layout follows sns.displot
+    fig, ax = plt.subplots(figsize=(6, 5))
+    for group, grid, values in curves:
+        ax.plot(grid, values, label=group, drawstyle='steps-post' if kind == 'ecdf' else 'default')
+    ax.set_xlabel(x)
+    ax.set_ylabel('Proportion' if kind == 'ecdf' else 'Density')
+    ax.spines[['top', 'right']].set_visible(False)
+    ax.legend(title=hue, loc='center left', bbox_to_anchor=(1, 0.5), frameon=False)
+    return fig
+
+def age_group_barplot(data, x):
+    fig, ax = plt.subplots()
+    sns.barplot(x=x, y='Age group', data=data, palette='viridis', ax=ax)
+    return fig
 
 # Plotting pivot table
-st.subheader('Bar plot of mean wages by education level from pivot table')
-fig, ax = plt.subplots(figsize=(10, 6))
-sns.barplot(data=piv.reset_index(), x='Education level', y=piv.columns[0], ax=ax)
-plt.title('Mean Wages by Education Level')
-plt.xlabel('Education Level')
-plt.xticks(rotation=90)
-plt.ylabel('Mean Wages (in thousands)')
-st.pyplot(fig)
-
-# Conclusion section
-st.subheader("Conclusion")
-st.write("""
+def pivot_barplot(piv):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(data=piv.reset_index(), x='Education level', y=piv.columns[0], ax=ax)
+    plt.title('Mean Wages by Education Level')
+    plt.xlabel('Education Level')
+    plt.xticks(rotation=90)
+    plt.ylabel('Mean Wages (in thousands)')
+    return fig
+
+# Sections; each one only runs while it is open
+
+def raw_data():
+    if mongo.use_mongo():
+        rows = mongo.collection_stats(mongo.INCOME_COLLECTION)['count']
+        version = data_version()
+        return raw_data_pages(rows, lambda number, size: mongo.income_page(version, number, size))
+    if streaming_mode():
+        return raw_data_preview()
+    # Display the raw data
+    st.write(income_data())
+
+def raw_data_preview():
+    # Only a sample or one page of the rows is sent to the browser
+    rows = streaming.summary(DATASET)['rows']
+    preview = st.radio('Preview', ['Sample', 'Pages'], horizontal=True, key='dd_raw_preview')
+    if preview == 'Sample':
+        sample = streaming.summary(DATASET)['sample']
+        st.write(f'A uniform sample of {len(sample):,} of the {rows:,} rows:')
+        st.write(sample)
+    else:
+        raw_data_pages(rows, lambda number, size: streaming.page(DATASET, number, size))
+
+def raw_data_pages(rows, read_page):
+    # `read_page(number, size)` returns the rows of page `number` (0-based)
+    pages = max(1, -(-rows // PAGE_ROWS))
+    number = st.number_input(f'Page (of {pages:,})', min_value=1, max_value=pages, value=1, key='dd_raw_page')
+    st.write(read_page(number - 1, PAGE_ROWS))
+
+def sum_of_wages():
+    sum_data, _ = summaries()
+    st.write(sum_data)
+
+def mean_wages():
+    _, mean_data = summaries()
+    st.write(mean_data)
+
+def mean_wages_plot():
+    if streaming_mode() or mongo.use_mongo():
+        # One bar per education level from the cube's (or the server's) means
+        _, mean_data = summaries()
+        figures.pyplot((data_version(), 'mean wages barplot', 'streamed'),
+                       lambda: mean_wages_barplot(mean_data.reset_index()))
+        return
+    data = income_data()
+    figures.pyplot((data_version(), 'mean wages barplot'), lambda: mean_wages_barplot(data))
+
+def distributions():
+    # KDE and ECDF curves on fixed grids, one pass over the data (see dd_core.distributions),
+    # and the version they were computed from
+    if mongo.use_mongo():
+        version = data_version()
+        return version, mongo_distributions(version)
+    return precompute.served('income_distributions')
+
+# The MongoDB documents are binned on the server; the curves are computed once per data version
+@st.cache_data(max_entries=2)
+def mongo_distributions(version):
+    return grids(mongo.income_histograms(version))
+
+def distribution_plot(measure, hue, kind):
+    version, curves = distributions()
+    figures.pyplot((version, 'distribution', measure, hue, kind),
+                   lambda: distribution_figure(curves[(kind, measure, hue)], measure, hue, kind))
+
+def density_plot(measure):
+    def render():
+        distribution_plot(measure, 'Type of work', 'kde')
+    return render
+
+def wage_classes():
+    for measure in ['Both Sexes', 'Male', 'Female']:
+        distribution_plot(measure, 'Wages', 'ecdf')
+
+def age_group_plots():
+    if mongo.use_mongo():
+        # Mean per age group, grouped on the server
+        data, variant = mongo.income_means(data_version(), 'Age group').reset_index(), ('streamed',)
+    elif streaming_mode():
+        # Mean per age group from the cube
+        _, data = cube.summarize(load_cube(datasets.source_version(DATASET)), 'Age group')
+        data, variant = data.reset_index(), ('streamed',)
+    else:
+        data, variant = income_data(), ()
+    for measure in ['Both Sexes', 'Male', 'Female']:
+        figures.pyplot((data_version(), 'age group barplot', measure, *variant), lambda: age_group_barplot(data, measure))
+
+def correlation_matrix():
+    # Correlation matrix
+    if mongo.use_mongo():
+        st.write(mongo.income_correlation(data_version()))
+        return
+    if streaming_mode():
+        st.write(streaming.summary(DATASET)['correlation'])
+        return
+    numeric_data = income_data().select_dtypes(include=[np.number])
+    st.write(numeric_data.corr())
+
+def pivot_plot():
+    version, tables = pivots()
+    figures.pyplot((version, 'pivot barplot'), lambda: pivot_barplot(tables[0]))
+
+# Page sections in display order: (title, renderer, open by default)
+SECTIONS = [
+    ('Raw data', raw_data, True),
+    ('Sum of wages by education level', sum_of_wages, True),
+    ('Mean wages by education level', mean_wages, True),
+    ('Bar plot of mean wages by education level', mean_wages_plot, False),
+    ('Density plot of wages by type of work', density_plot('Both Sexes'), False),
+    ('Density plot of wages by type of work for Male', density_plot('Male'), False),
+    ('Density plot of wages by type of work For Female', density_plot('Female'), False),
+    ('Distribute Wages data into all available classes', wage_classes, False),
+    ('Bar plot of wages by age group', age_group_plots, False),
+    ('Correlation matrix', correlation_matrix, False),
+    ('Bar plot of mean wages by education level from pivot table', pivot_plot, False),
+]
+
+def main():
+    # Load and display an image (e.g., a logo) in the sidebar
+    logo_path = 'graphics/dd_logo.png'
+    st.sidebar.image(logo_path, use_column_width=True)
+
+    # Add Contents Overview in the sidebar; clicking an entry opens that section
+    sections.sidebar_contents([title for title, _, _ in SECTIONS])
+
+    st.title("Analyzing Wage Disparities by Education Level in Canada")
+
+    for title, render, expanded in SECTIONS:
+        sections.section(title, render, expanded)
+
+    # Conclusion section
+    st.subheader("Conclusion")
+    st.write("""
 The bar chart demonstrates a positive correlation between the level of education and mean wages; generally, individuals with higher education levels earn higher wages. This trend is consistent with the economic theory that investment in human capital, such as education, enhances productivity and, consequently, earnings. There are, however, some nuances, such as 'Trade Certificate or Diploma' earning similar to 'Community College/CEGEP,' which might be due to specific demand for skilled trades. The 'Total all education levels' bar provides a benchmark mean wage against which the wages for specific education levels can be compared.
 """)
 
-# Add a footer
-footer_html = """
+    # Add a footer
+    footer_html = """
 <div style='text-align: center;'>
     <p style='margin: 20px 0;'>
         ©2024 Summer (Dr. Shafaq Khan) Advanced Database Topics, All Rights Reserved.
     </p>
 </div>
 """
-st.markdown(footer_html, unsafe_allow_html=True)
\ No newline at end of file
+    st.markdown(footer_html, unsafe_allow_html=True)
+
+if __name__ == '__main__':
+    main()
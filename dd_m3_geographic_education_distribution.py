@@ -1,87 +1,72 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import streamlit as st
-import seaborn as sns
-import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 import plotly.express as px
-from PIL import Image
 import plotly.graph_objs as go
 
-# Load the dataset with caching for efficiency
-@st.cache_data
-def load_data():
-    return pd.read_csv('content/dd_m3_geographic_education_distribution.csv')
+from dd_core import datasets, figures, geo, mongo, precompute, sections
+from dd_core.panel import AttainmentPanel
 
-df = load_data()
+DATASET = 'geographic_education_distribution'
 
-# Load and display an image (e.g., a logo) in the sidebar
-logo_path = 'graphics/dd_logo.png'
-st.sidebar.image(logo_path, use_column_width=True)
+# Load the typed dataset once per version (the version invalidates the cache when the CSV changes); one
+# read-only instance is shared by all sections and sessions, so it must not be modified
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    return datasets.load(DATASET)
 
-# Add Contents Overview in the sidebar
-st.sidebar.header('Contents Overview:')
-st.sidebar.markdown("""
-- [Introduction](#introduction)
-- [Descriptive Statistics](#descriptive-statistics)
-- [Matplotlib Visualizations](#matplotlib-visualizations)
-- [Interactive Plotly Visualizations](#interactive-plotly-visualizations)
-- [Correlation Matrix](#correlation-matrix)
-- [Clustering of States based on Education Statistics](#clustering-of-states-based-on-education-statistics)
-- [Conclusion](#conclusion)
-""")
+def education_data():
+    # With DD_DATA_SOURCE=mongo the same layout is rebuilt from MongoDB
+    if mongo.use_mongo():
+        return mongo.geographic_frame(mongo.collection_version(mongo.GEOGRAPHIC_COLLECTION))
+    return load_data(datasets.source_version(DATASET))
 
-# Main title of the application
-st.title("Exploring Education Levels Across Canadian Regions")
+def data_version(df):
+    # Fingerprint of the loaded data, part of every cached figure's key
+    if mongo.use_mongo():
+        return datasets.frame_fingerprint(df)
+    return datasets.source_version(DATASET)
 
-# Introduction section
-# This section introduces the topic and provides an overview of the content.
-st.subheader("Introduction")
-st.write("This module explores the education levels across different regions of Canada, using data from 2019 to 2022. The following sections provide various visualizations and analyses to understand the educational attainment in these regions.")
+# The same data as a (Geography x attainment level x year) panel, built once per
+# data version and shared read-only by all sessions (see dd_core.panel)
+@st.cache_resource(max_entries=4)
+def load_panel(version, _df):
+    return AttainmentPanel.from_frame(_df)
 
-# Descriptive statistics section
-# This section displays descriptive statistics for the dataset.
-st.subheader("Descriptive Statistics")
-st.write(df.describe())
+def education_panel(df):
+    return load_panel(data_version(df), df)
 
-# Display the top rows of the dataframe
-st.write("Education Level Data from 2019-2022:", df.head())
+LEVELS = ['Below upper secondary 7', 'Upper secondary and post-secondary non-tertiary', 'Tertiary education']
 
 # Define a function to plot educational attainment data for a given state using Matplotlib
-def plot_state_data(state):
-    state_data = df[df['Geography'] == state]
-    below_secondary_mean = state_data[state_data['Educational attainment level'] == 'Below upper secondary 7'].iloc[:, 2:].mean(numeric_only=True)
-    post_secondary_mean = state_data[state_data['Educational attainment level'] == 'Upper secondary and post-secondary non-tertiary'].iloc[:, 2:].mean(numeric_only=True)
-    tertiary_mean = state_data[state_data['Educational attainment level'] == 'Tertiary education'].iloc[:, 2:].mean(numeric_only=True)
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(below_secondary_mean.index, below_secondary_mean.values, label='Below Upper Secondary 7')
-    plt.plot(post_secondary_mean.index, post_secondary_mean.values, label='Upper Secondary and Post-Secondary Non-Tertiary')
-    plt.plot(tertiary_mean.index, tertiary_mean.values, label='Tertiary Education')
+def state_data_figure(panel, state):
+    below_secondary, post_secondary, tertiary = panel.state(state, LEVELS)
+
+    fig = plt.figure(figsize=(10, 6))
+    plt.plot(panel.years, below_secondary, label='Below Upper Secondary 7')
+    plt.plot(panel.years, post_secondary, label='Upper Secondary and Post-Secondary Non-Tertiary')
+    plt.plot(panel.years, tertiary, label='Tertiary Education')
     plt.title(f"Educational Attainment in {state}")
     plt.xlabel("Year")
     plt.ylabel("Mean Percentage")
     plt.grid(True)
     plt.legend()
-    st.pyplot(plt)
+    return fig
 
-# Matplotlib Visualizations section
-# This section provides Matplotlib visualizations for a selected state.
-st.subheader("Matplotlib Visualizations")
-selected_state_matplotlib = st.selectbox("Select a State for Matplotlib Visualizations:", df['Geography'].unique())
-plot_state_data(selected_state_matplotlib)
+def plot_state_data(df, state):
+    panel = education_panel(df)
+    figures.pyplot((data_version(df), 'state data', state), lambda: state_data_figure(panel, state))
 
 # Define a function to create interactive graphs using Plotly for a given state
-def interactive_graphs(state):
-    state_data = df[df['Geography'] == state]
-    categories = ['Below upper secondary 7', 'Upper secondary and post-secondary non-tertiary', 'Tertiary education']
-    years = df.columns[2:].tolist()  # Assuming year columns start from 3rd column
+def interactive_graphs_figure(panel, state):
+    categories = LEVELS
+    values = panel.state(state, categories)
 
-    data = {year: [state_data[state_data['Educational attainment level'] == category][year].values[0] if not state_data[state_data['Educational attainment level'] == category][year].empty else None for category in categories] for year in years}
+    # One trace per year with a non-zero figure for every category
     traces = []
-    for year in years:
-        if all(data[year]):
-            trace = go.Scatter(x=categories, y=data[year], mode='lines+markers', name=year,
+    for year, data in zip(panel.years, values.T):
+        if np.all(np.nan_to_num(data)):
+            trace = go.Scatter(x=categories, y=data, mode='lines+markers', name=year,
                                hovertemplate='<b>%{x}</b><br>%{y:.2f}%<extra></extra>')
             traces.append(trace)
 
@@ -98,89 +83,187 @@ def interactive_graphs(state):
         showlegend=True,
         legend=dict(title='Year', orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
     )
-    st.plotly_chart(fig)
-
-# Interactive Plotly Visualizations section
-# This section provides interactive visualizations using Plotly for a selected state.
-st.subheader("Interactive Plotly Visualizations")
-selected_state_plotly = st.selectbox("Select a State for Plotly Visualizations:", df['Geography'].unique())
-interactive_graphs(selected_state_plotly)
+    return fig
 
-# Correlation Matrix section
-# This section displays a correlation matrix heatmap.
-st.subheader("Correlation Matrix")
-correlation_matrix = df.corr(numeric_only=True)
-st.write(correlation_matrix)
-fig, ax = plt.subplots()
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f")
-st.pyplot(fig)
+def interactive_graphs(df, state):
+    panel = education_panel(df)
+    figures.plotly_chart((data_version(df), 'interactive graphs', state), lambda: interactive_graphs_figure(panel, state))
 
-# Clustering of States based on Education Statistics section
-# This section clusters states based on their education statistics using K-means clustering.
-st.subheader("Clustering of States based on Education Statistics")
+def correlation_heatmap(correlation_matrix):
+    # seaborn is only needed when the heatmap is not in the figure cache yet
+    import seaborn as sns
 
-# Pivot the data to have states as rows and years as columns
-pivot_data = df.pivot(index='Geography', columns='Educational attainment level')
+    fig, ax = plt.subplots()
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+    return fig
 
-# Flatten the multi-level column index for simplicity
-pivot_data.columns = ['_'.join(col).strip() for col in pivot_data.columns.values]
-
-# Select only the columns containing years (assuming year columns have numeric names)
-year_columns = [col for col in pivot_data.columns if col.split('_')[0].isdigit()]
+# Visualize the clusters with state labels
+def cluster_figure(clusters):
+    # Cluster of every geography, placed by the first two principal components of its standardized figures
+    points = clusters['points']
+    cluster_labels = points['Cluster']
+    explained = clusters['explained_variance']
 
-# Select data for clustering
-X = pivot_data[year_columns]
+    # Define colors for each cluster
+    cluster_colors = {0: 'darkblue', 1: 'green', 2: 'red'}  # Adjust colors as needed
 
-# Normalize the data
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+    # Define marker sizes for each cluster
+    cluster_sizes = {0: 15, 1: 12, 2: 12}  # Adjust sizes as needed
 
-# Choose the number of clusters
-num_clusters = 3
+    fig = px.scatter(x=points['PC1'], y=points['PC2'], color=cluster_labels, hover_name=points.index, color_discrete_map=cluster_colors)
+    fig.update_traces(marker=dict(size=[cluster_sizes.get(label, 12) for label in cluster_labels]))  # Update marker sizes
+    fig.update_layout(
+        title='Clustering of States based on Education Statistics',
+        xaxis_title=f'Principal Component 1 ({explained[0]:.0%} of variance)',
+        yaxis_title=f'Principal Component 2 ({explained[1]:.0%} of variance)',
+        showlegend=True,
+        legend_title='Cluster'
+    )
 
-# Apply K-means clustering
-kmeans = KMeans(n_clusters=num_clusters, n_init=10, random_state=42)
-cluster_labels = kmeans.fit_predict(X_scaled)
+    # Update hover template for clarity
+    fig.update_traces(hovertemplate='<b>%{hovertext}</b><br>Cluster: %{marker.color}')
+    return fig
+
+def attainment_map_html(panel, level, year):
+    # Choropleth of one attainment level and year; OECD and Canada-wide rows have no region and are left out
+    values = panel.level(level)[year].to_dict()
+    return geo.region_map_html(values, caption=f'{level}, {year} (%)')
+
+# Sections; each one is shown under its heading
+
+def descriptive_statistics():
+    # This section displays descriptive statistics for the dataset.
+    df = education_data()
+    with sections.timed("Descriptive Statistics"):
+        st.write(df.describe())
+
+        # Display the top rows of the dataframe
+        st.write("Education Level Data from 2019-2022:", df.head())
+
+def matplotlib_visualizations():
+    # This section provides Matplotlib visualizations for a selected state.
+    df = education_data()
+    selected_state_matplotlib = st.selectbox("Select a State for Matplotlib Visualizations:",
+                                             education_panel(df).geographies, key='dd_state_matplotlib')
+    with sections.timed("Matplotlib Visualizations"):
+        plot_state_data(df, selected_state_matplotlib)
+
+def plotly_visualizations():
+    # This section provides interactive visualizations using Plotly for a selected state.
+    df = education_data()
+    selected_state_plotly = st.selectbox("Select a State for Plotly Visualizations:",
+                                         education_panel(df).geographies, key='dd_state_plotly')
+    with sections.timed("Interactive Plotly Visualizations"):
+        interactive_graphs(df, selected_state_plotly)
+
+def attainment_map():
+    # This section maps one attainment level across the provinces and territories for a selected year.
+    df = education_data()
+    panel = education_panel(df)
+    level = st.selectbox("Select an Educational Attainment Level:", LEVELS, key='dd_map_level')
+    year = st.select_slider("Select a Year:", panel.years, value=panel.years[-1], key='dd_map_year')
+    with sections.timed("Map of Educational Attainment"):
+        # The map is cached as HTML and shown in an iframe, so panning and zooming do not rerun the page
+        figures.html((data_version(df), 'attainment map', geo.regions_version(), level, year),
+                     lambda: attainment_map_html(panel, level, year), height=500)
+
+def correlation_matrix_section():
+    # This section displays a correlation matrix heatmap.
+    df = education_data()
+    with sections.timed("Correlation Matrix"):
+        correlation_matrix = df.corr(numeric_only=True)
+        st.write(correlation_matrix)
+        figures.pyplot((data_version(df), 'correlation heatmap'), lambda: correlation_heatmap(correlation_matrix))
+
+def clustering():
+    # This section clusters states based on their education statistics using K-means clustering.
+
+    # K-means clustering with 3 clusters, precomputed off the request path (see dd_core.precompute)
+    num_clusters = 3
+    with sections.timed("Clustering of States based on Education Statistics"):
+        try:
+            clusters_version, clusters = precompute.served('state_clusters')
+        except precompute.Pending as pending:
+            st.info(str(pending))
+            return
+        figures.plotly_chart((clusters_version, 'clusters', num_clusters), lambda: cluster_figure(clusters['fixed']))
+
+        # How the number of clusters compares with the automatic choice
+        auto = clusters['auto']
+        with st.expander("Choosing the number of clusters"):
+            st.write(f"The silhouette score is highest for k = {auto['k']}; the elbow of the inertia is at k = {auto['elbow_k']}.")
+            st.dataframe(auto['selection'], hide_index=True)
+
+# Page sections in display order: (title, renderer)
+SECTIONS = [
+    ('Descriptive Statistics', descriptive_statistics),
+    ('Matplotlib Visualizations', matplotlib_visualizations),
+    ('Interactive Plotly Visualizations', plotly_visualizations),
+    ('Map of Educational Attainment', attainment_map),
+    ('Correlation Matrix', correlation_matrix_section),
+    ('Clustering of States based on Education Statistics', clustering),
+]
+
+def geography_choices(key):
+    # Every option of a state selectbox, for the static export (see scripts/export.py)
+    return [{key: geography} for geography in education_panel(education_data()).geographies]
+
+# Widget values each section is exported with; sections not listed are exported once with the defaults
+EXPORT_VARIANTS = {
+    'Matplotlib Visualizations': lambda: geography_choices('dd_state_matplotlib'),
+    'Interactive Plotly Visualizations': lambda: geography_choices('dd_state_plotly'),
+    'Map of Educational Attainment': lambda: [{'dd_map_level': level, 'dd_map_year': year} for level in LEVELS
+                                              for year in education_panel(education_data()).years],
+}
+
+def main():
+    # Load and display an image (e.g., a logo) in the sidebar
+    logo_path = 'graphics/dd_logo.png'
+    st.sidebar.image(logo_path, use_column_width=True)
+
+    # Add Contents Overview in the sidebar
+    st.sidebar.header('Contents Overview:')
+    st.sidebar.markdown("""
+- [Introduction](#introduction)
+- [Descriptive Statistics](#descriptive-statistics)
+- [Matplotlib Visualizations](#matplotlib-visualizations)
+- [Interactive Plotly Visualizations](#interactive-plotly-visualizations)
+- [Map of Educational Attainment](#map-of-educational-attainment)
+- [Correlation Matrix](#correlation-matrix)
+- [Clustering of States based on Education Statistics](#clustering-of-states-based-on-education-statistics)
+- [Conclusion](#conclusion)
+""")
 
-# Add cluster labels to the original data
-pivot_data['Cluster'] = cluster_labels
+    # Main title of the application
+    st.title("Exploring Education Levels Across Canadian Regions")
 
-# Define colors for each cluster
-cluster_colors = {0: 'darkblue', 1: 'green', 2: 'red'}  # Adjust colors as needed
+    # Introduction section
+    # This section introduces the topic and provides an overview of the content.
+    st.subheader("Introduction")
+    st.write("This module explores the education levels across different regions of Canada, using data from 2019 to 2022. The following sections provide various visualizations and analyses to understand the educational attainment in these regions.")
 
-# Define marker sizes for each cluster
-cluster_sizes = {0: 15, 1: 12, 2: 12}  # Adjust sizes as needed
+    # Descriptive statistics, visualizations, correlation matrix and clustering
+    for title, render in SECTIONS:
+        st.subheader(title)
+        render()
 
-# Visualize the clusters with state labels
-fig = px.scatter(x=X_scaled[:, 0], y=X_scaled[:, 1], color=cluster_labels, hover_name=pivot_data.index, color_discrete_map=cluster_colors)
-fig.update_traces(marker=dict(size=[cluster_sizes[label] for label in cluster_labels]))  # Update marker sizes
-fig.update_layout(
-    title='Clustering of States based on Education Statistics',
-    xaxis_title='Principal Component 1',
-    yaxis_title='Principal Component 2',
-    showlegend=True,
-    legend_title='Cluster'
-)
-
-# Update hover template for clarity
-fig.update_traces(hovertemplate='<b>%{hovertext}</b><br>Cluster: %{marker.color}')
-
-st.plotly_chart(fig)
-
-# Conclusion section
-# This section provides a conclusion based on the analysis.
-st.subheader("Conclusion")
-st.write("""
+    # Conclusion section
+    # This section provides a conclusion based on the analysis.
+    st.subheader("Conclusion")
+    st.write("""
 The overarching conclusion is that Canada's education levels are comparable to OECD averages, with strong upper secondary and post-secondary non-tertiary attainment. However, there are regional disparities, especially in tertiary education, that could be influenced by local factors. This suggests a need for targeted educational policies to address regional discrepancies and to maintain or improve educational standards nationwide.
 """)
 
-# Footer section
-# This section provides the footer information for the application.
-footer_html = """
+    # Footer section
+    # This section provides the footer information for the application.
+    footer_html = """
 <div style='text-align: center;'>
     <p style='margin: 20px 0;'>
         ©2024 Summer (Dr. Shafaq Khan) Advanced Database Topics, All Rights Reserved.
     </p>
 </div>
 """
-st.markdown(footer_html, unsafe_allow_html=True)
\ No newline at end of file
+    st.markdown(footer_html, unsafe_allow_html=True)
+
+if __name__ == '__main__':
+    main()
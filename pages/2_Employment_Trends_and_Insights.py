@@ -0,0 +1,10 @@
+import importlib
+
+import streamlit as st
+
+# Hosts a dashboard module as a page of dd_dashboard.py. The module (and its
+# heavy imports) is only imported the first time the page is opened; from then on its
+# data, model and figure caches are shared with every other page and session.
+st.set_page_config(page_title="Employment Trends and Insights", page_icon=":mortar_board:", layout="wide")
+
+importlib.import_module("dd_m2_employment_trends_and_insights").main()
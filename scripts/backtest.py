@@ -0,0 +1,45 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from dd_core import backtest, datasets, forecasts
+
+# Rolling-origin backtest of ARIMA orders over the monthly series (see dd_core/backtest.py):
+#   python -m scripts.backtest [--orders 1,1,1 0,1,1] [--horizon 12] [--min-train 24] [--workers N]
+#
+# Prints MAE and MAPE per forecast step for the Ontario employment series and
+# every industry, occupation and unemployment series. Results are cached per
+# series, order and horizon, so comparing a new order only fits that order.
+
+
+def parse_order(text):
+    return tuple(int(part) for part in text.split(','))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backtest ARIMA orders on the monthly series.')
+    parser.add_argument('--orders', nargs='+', type=parse_order, default=forecasts.BACKTEST_ORDERS,
+                        help='orders as p,d,q (default: %(default)s)')
+    parser.add_argument('--horizon', type=int, default=backtest.HORIZON, help='months forecast from each origin')
+    parser.add_argument('--min-train', type=int, default=backtest.MIN_TRAIN, help='months of the first window')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='size of the process pool')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    series = forecasts.employment_series(datasets.load('employment'))
+    collected = {('employment', series.name): series}
+    collected.update(forecasts.collect_series())
+    errors = backtest.backtest_many(collected, orders=args.orders, horizon=args.horizon,
+                                    min_train=args.min_train, workers=args.workers)
+    accuracy = backtest.accuracy(errors)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(accuracy.pivot_table(index=['dataset', 'series', 'order'], columns='step', values='mape').round(2))
+    backtested = len(errors[['dataset', 'series']].drop_duplicates())
+    print(f'{backtested} of {len(collected)} series, {len(args.orders)} orders in {time.perf_counter() - start:.2f}s')
+    return accuracy
+
+
+if __name__ == '__main__':
+    main()
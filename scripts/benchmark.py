@@ -0,0 +1,201 @@
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from dd_core.paths import ROOT_DIR
+
+# Headless load benchmark of the dashboard modules:
+#   python -m scripts.benchmark [--modules m1 m2 m3] [--reruns 5] [--sessions 1 4 8] [--output report.json]
+#
+# Each module is measured in its own fresh process (so "cold" really is cold) using
+# Streamlit's AppTest, without a browser:
+#  - cold:         first run of the script
+#  - warm:         plain reruns of the same session
+#  - interactions: the module's widget scenario (opening every section in m1/m2,
+#                  switching the two state selectboxes in m3), timed per step
+#  - concurrent:   N simulated sessions running the scenario at the same time. AppTest
+#                  swaps a mock Runtime in and out of the process for every run, so
+#                  sessions are forked processes instead of threads; they start from
+#                  the warm in-memory caches of the measuring process, like sessions
+#                  of one server would
+#  - spans:        the dd_core.tracing aggregates (page sections, dataset builds, model
+#                  fits, figure renders, with their cache hit rates)
+#  - peak RSS of the process
+# The report is JSON, so it can be diffed against a previous run.
+
+MODULES = {
+    'm1': 'dd_m1_income_levels_by_education.py',
+    'm2': 'dd_m2_employment_trends_and_insights.py',
+    'm3': 'dd_m3_geographic_education_distribution.py',
+}
+
+
+def open_all_sections(at):
+    for toggle in at.toggle:
+        toggle.set_value(True)
+    yield 'open all sections', at.run
+    yield 'rerun', at.run
+
+
+def switch_states(at, steps=5):
+    states = at.selectbox[0].options
+    for i in range(min(steps, len(states))):
+        at.selectbox[0].select(states[i])
+        at.selectbox[1].select(states[-1 - i])
+        yield f'select {states[i]} / {states[-1 - i]}', at.run
+
+
+SCENARIOS = {
+    'm1': open_all_sections,
+    'm2': open_all_sections,
+    'm3': switch_states,
+}
+
+
+def _timed(action):
+    start = time.perf_counter()
+    at = action()
+    elapsed = time.perf_counter() - start
+    if at is not None and len(at.exception):
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'mean': statistics.fmean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max': samples[-1],
+    }
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_session(path, scenario, timeout, barrier=None):
+    from streamlit.testing.v1 import AppTest
+
+    if barrier is not None:
+        barrier.wait()
+    at = AppTest.from_file(path, default_timeout=timeout)
+    steps = [('first run', _timed(at.run))]
+    for name, action in scenario(at):
+        steps.append((name, _timed(action)))
+    return steps
+
+
+def _session_process(path, scenario, timeout, barrier, results):
+    results.put(run_session(path, scenario, timeout, barrier))
+
+
+def measure_module(name, reruns, sessions, timeout):
+    # Runs inside the worker process for one module
+    from streamlit.testing.v1 import AppTest
+
+    from dd_core import tracing
+
+    path = MODULES[name]
+    scenario = SCENARIOS[name]
+    report = {'module': path}
+
+    at = AppTest.from_file(path, default_timeout=timeout)
+    report['cold_seconds'] = _timed(at.run)
+    report['peak_rss_mb_after_cold'] = _peak_rss_mb()
+    report['warm_seconds'] = _summary([_timed(at.run) for _ in range(reruns)])
+    report['interactions'] = [{'step': step, 'seconds': _timed(action)} for step, action in scenario(at)]
+
+    report['concurrent'] = {}
+    context = multiprocessing.get_context('fork')
+    for count in sessions:
+        barrier = context.Barrier(count)
+        queue = context.Queue()
+        processes = [context.Process(target=_session_process, args=(path, scenario, timeout, barrier, queue))
+                     for _ in range(count)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        wall = time.perf_counter() - start
+        report['concurrent'][str(count)] = {
+            'wall_seconds': wall,
+            'sessions_per_second': count / wall,
+            'session_seconds': _summary([sum(seconds for _, seconds in steps) for steps in results]),
+            'step_seconds': _summary([seconds for steps in results for _, seconds in steps]),
+        }
+
+    report['spans'] = tracing.snapshot()
+    report['peak_rss_mb'] = _peak_rss_mb()
+    report['peak_rss_mb_sessions'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return report
+
+
+def run_worker(name, args):
+    # Every module is measured in a fresh interpreter
+    command = [sys.executable, '-m', 'scripts.benchmark', '--worker', name,
+               '--reruns', str(args.reruns), '--timeout', str(args.timeout),
+               '--sessions', *[str(count) for count in args.sessions]]
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT_DIR, env.get('PYTHONPATH')]))
+    env['DD_TRACING'] = '1'
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT_DIR, env=env)
+    if completed.returncode != 0:
+        return {'module': MODULES[name], 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_summary(report):
+    for name, result in report['modules'].items():
+        if 'error' in result:
+            print(f"{name}: failed {result['error']}")
+            continue
+        print(f"{name}: cold {result['cold_seconds']:.2f}s, warm p50 {result['warm_seconds']['p50']:.3f}s, "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB")
+        for count, stats in result['concurrent'].items():
+            print(f"    {count:>3} sessions: {stats['wall_seconds']:.2f}s wall, "
+                  f"step p95 {stats['step_seconds']['p95']:.3f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dashboard reruns under simulated sessions.')
+    parser.add_argument('--modules', nargs='+', choices=list(MODULES), default=list(MODULES))
+    parser.add_argument('--reruns', type=int, default=5, help='warm reruns per module')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 8],
+                        help='numbers of concurrent sessions to simulate')
+    parser.add_argument('--timeout', type=float, default=300, help='per-run timeout in seconds')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--worker', choices=list(MODULES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure_module(args.worker, args.reruns, args.sessions, args.timeout)))
+        return
+
+    report = {
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'modules': {name: run_worker(name, args) for name in args.modules},
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print_summary(report)
+    else:
+        print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import time
+
+from dd_core import cube, streaming
+
+# Offline build of the m1 aggregate cube, run after each data refresh:
+#   python -m scripts.build_cube
+# The m1 page rebuilds it on demand as well, but only when the cube is missing or stale.
+# For extracts large enough for the page's streaming mode, the streamed summary
+# (see dd_core/streaming.py) is folded here as well.
+
+
+def main():
+    start = time.perf_counter()
+    path = cube.refresh_cube()
+    cells = cube.load_cube()
+    print(f'{path}: {len(cells)} cells in {time.perf_counter() - start:.2f}s')
+
+    if streaming.use_streaming():
+        start = time.perf_counter()
+        summary = streaming.summary()
+        print(f"streamed summary: {summary['rows']} rows in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import unicodedata
+
+from dd_core import geo
+
+# Builds content/canada_regions.geojson, the province and territory outlines of
+# the maps (see dd_core/geo.py), from a published boundary file:
+#   python -m scripts.build_regions --source naturalearth ne_10m_admin_1_states_provinces.geojson
+#   python -m scripts.build_regions --source statcan lpr_000b21a_e.geojson
+#
+# Natural Earth publishes the admin-1 layer as GeoJSON (every country; the
+# Canadian features are kept). Statistics Canada publishes the cartographic
+# province and territory boundary file as a shapefile in Lambert conformal conic;
+# convert it to WGS 84 GeoJSON first:
+#   ogr2ogr -f GeoJSON -t_srs EPSG:4326 lpr_000b21a_e.geojson lpr_000b21a_e.shp
+#
+# The features are renamed to the m3 geographies, the coordinates rounded to
+# `precision` decimals (4 is about 10 m) and the source's attribution stored in
+# the collection, which the maps show. The vertices kept at each zoom level are
+# printed, to check the tolerances of geo.ZOOM_LEVELS against the new outlines.
+
+SOURCES = {
+    'naturalearth': {
+        'name_fields': ['name_en', 'name'],
+        'country_fields': {'adm0_a3': 'CAN', 'iso_a2': 'CA', 'admin': 'Canada'},
+        'attribution': 'Boundaries: Made with Natural Earth (naturalearthdata.com)',
+        'license': 'Public domain (https://www.naturalearthdata.com/about/terms-of-use/)',
+    },
+    'statcan': {
+        'name_fields': ['PRENAME', 'PRENAME_E'],
+        'country_fields': {},
+        'attribution': 'Boundaries: Statistics Canada, Census Boundary Files',
+        'license': 'Statistics Canada Open Licence (https://www.statcan.gc.ca/en/reference/licence)',
+    },
+}
+
+REGIONS = ['Newfoundland and Labrador', 'Prince Edward Island', 'Nova Scotia', 'New Brunswick', 'Quebec',
+           'Ontario', 'Manitoba', 'Saskatchewan', 'Alberta', 'British Columbia', 'Yukon',
+           'Northwest Territories', 'Nunavut']
+
+
+def _plain(text):
+    # 'Québec' and 'Quebec' compare equal
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().strip().lower()
+
+
+def _region(properties, spec):
+    for field in spec['name_fields']:
+        value = properties.get(field)
+        if value:
+            for region in REGIONS:
+                if _plain(value) == _plain(region):
+                    return region
+    return None
+
+
+def _in_country(properties, spec):
+    fields = [field for field in spec['country_fields'] if field in properties]
+    return not fields or any(properties[field] == spec['country_fields'][field] for field in fields)
+
+
+def _round(coordinates, precision):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(value, precision) for value in coordinates]
+    return [_round(part, precision) for part in coordinates]
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return list(geometry['coordinates'])
+    return []
+
+
+def convert(collection, source, precision=4):
+    # The FeatureCollection of the regions in the layout geo.py reads: one feature
+    # per region (parts of one region merged into a MultiPolygon) named like m3
+    spec = SOURCES[source]
+    polygons = {}
+    for feature in collection['features']:
+        properties = feature.get('properties') or {}
+        region = _region(properties, spec)
+        if region is None or not _in_country(properties, spec) or not feature.get('geometry'):
+            continue
+        polygons.setdefault(region, []).extend(_round(polygon, precision)
+                                               for polygon in _polygons(feature['geometry']))
+    missing = [region for region in REGIONS if region not in polygons]
+    if missing:
+        raise ValueError(f'no boundaries for {", ".join(missing)} in the {source} file')
+    features = []
+    for region in REGIONS:
+        parts = polygons[region]
+        geometry = ({'type': 'Polygon', 'coordinates': parts[0]} if len(parts) == 1
+                    else {'type': 'MultiPolygon', 'coordinates': parts})
+        features.append({'type': 'Feature', 'properties': {'name': region}, 'geometry': geometry})
+    return {
+        'type': 'FeatureCollection',
+        'properties': {'source': source, 'attribution': spec['attribution'], 'license': spec['license']},
+        'features': features,
+    }
+
+
+def vertices(collection):
+    return sum(len(ring) for feature in collection['features']
+               for polygon in _polygons(feature['geometry']) for ring in polygon)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the map outlines from a published boundary file.')
+    parser.add_argument('path', help='GeoJSON boundary file (WGS 84)')
+    parser.add_argument('--source', choices=list(SOURCES), required=True, help='publisher of the file')
+    parser.add_argument('--precision', type=int, default=4, help='decimals kept of each coordinate')
+    parser.add_argument('--out', default=geo.REGIONS_FILE, help='output GeoJSON')
+    args = parser.parse_args(argv)
+
+    with open(args.path, encoding='utf-8') as file:
+        collection = convert(json.load(file), args.source, args.precision)
+    tmp_path = f'{args.out}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(collection, file, separators=(',', ':'))
+    os.replace(tmp_path, args.out)
+
+    print(f'{args.out}: {len(collection["features"])} regions, {vertices(collection):,} vertices, '
+          f'{os.path.getsize(args.out) / 1e6:.1f} MB')
+    for zoom, tolerance in geo.ZOOM_TOLERANCES.items():
+        print(f'  zoom {zoom}+: tolerance {tolerance:.5f} deg, '
+              f'{vertices(geo.simplify(collection, tolerance)):,} vertices')
+    return collection
+
+
+if __name__ == '__main__':
+    main()
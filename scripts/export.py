@@ -0,0 +1,78 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dd_core import export
+from scripts.precompute import run_stale
+
+# Static export of every section of the dashboard, for anonymous read-only
+# traffic served by any static file server:
+#   python -m scripts.export [--out export] [--modules m1 m2 m3] [--workers N] [--force]
+#
+# The precomputed artifacts are brought up to date first, then the sections are
+# rendered in a process pool into <out>/<module>/<section>[/<variant>]/index.html
+# with their PNG, Plotly JSON and table JSON files (see dd_core/export.py).
+# Sections whose inputs did not change since the last export are skipped.
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render every dashboard section to a static HTML/PNG/JSON bundle.')
+    parser.add_argument('--out', default=export.default_out_dir(), help='bundle directory')
+    parser.add_argument('--modules', nargs='+', choices=list(export.MODULES), default=list(export.MODULES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='size of the process pool')
+    parser.add_argument('--force', action='store_true', help='export unchanged sections as well')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    # Render from current results: a job that failed above is computed inline by the
+    # sections instead of serving its previous version (inherited by the pool's processes)
+    os.environ['DD_PRECOMPUTE_INLINE'] = '1'
+    jobs = sorted({job for name in args.modules for job in export.MODULES[name]['jobs']})
+    run_stale(jobs, args.workers)
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest = export.load_manifest(args.out)
+    planned = export.tasks(args.modules)
+    todo = [task for task in planned if args.force or not export.unchanged(task, manifest, args.out)]
+    print(f'{len(planned)} sections, {len(planned) - len(todo)} unchanged', flush=True)
+
+    failed = 0
+    if todo:
+        # spawn, so no Streamlit or MongoDB state is inherited from this process
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(todo)), mp_context=context) as pool:
+            futures = {pool.submit(export.render_task, task, args.out): task for task in todo}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    done = future.result()
+                except Exception as error:
+                    failed += 1
+                    print(f"{task['id']}: failed: {error!r}", flush=True)
+                    continue
+                manifest[done['id']] = entry = done['entry']
+                print(f"{done['id']}: {len(entry['files'])} files ({entry['seconds']:.2f}s)", flush=True)
+
+    # Drop sections that no longer exist (e.g. a geography removed from the data), with their files
+    current = {task['id'] for task in planned}
+    exported = {name for name in args.modules}
+    for section in [section for section in manifest
+                    if section not in current and section.split('/')[0] in exported]:
+        export.remove_section(args.out, section, manifest.pop(section))
+    # Unchanged sections keep their files; their titles and positions follow the current pages
+    # (a section that failed to render keeps its old key, so the next run retries it)
+    for task in planned:
+        entry = manifest.get(task['id'])
+        if entry is not None and entry['key'] == task['key']:
+            manifest[task['id']] = export.manifest_entry(task, entry['files'], entry['seconds'])
+    export.save_manifest(args.out, manifest)
+    # The index lists the sections of every module exported so far, not only of this run's --modules
+    export.write_index(args.out, manifest)
+    print(f'exported to {args.out} in {time.perf_counter() - start:.2f}s', flush=True)
+    return failed
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+import argparse
+import os
+import time
+
+from dd_core import datasets, precompute
+
+# Append-only ingestion of the monthly exports, run after new rows were added to
+# the CSVs under content/:
+#   python -m scripts.ingest [DATASET ...] [--precompute] [--workers N]
+#
+# A CSV that only grew at the end has just its new rows parsed, checked (one row
+# per month, continuing the stored months) and appended to its typed table; any
+# other change rebuilds the table. Only what depends on a changed dataset goes
+# stale: its page caches and figures (keyed by its version), the precomputed
+# artifacts that read it and its ARIMA models, which are extended with the new
+# observations instead of refitted (see dd_core/models.py).
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Append new rows of the exports to the typed tables.')
+    parser.add_argument('datasets', nargs='*', help='datasets to ingest (default: all)')
+    parser.add_argument('--precompute', action='store_true', help='recompute the artifacts that went stale')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='process pool size for --precompute')
+    args = parser.parse_args(argv)
+    unknown = set(args.datasets) - set(datasets.DATASETS)
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(sorted(unknown))}")
+
+    changed = []
+    for name in args.datasets or list(datasets.DATASETS):
+        start = time.perf_counter()
+        report = datasets.ingest(name)
+        rows = f" ({report['rows']} rows)" if report['rows'] else ''
+        print(f"{name}: {report['action']}{rows} in {time.perf_counter() - start:.3f}s")
+        if report['action'] != 'unchanged':
+            changed.append(name)
+
+    stale = [job for job in precompute.stale_jobs() if set(precompute.JOBS[job]['inputs']) & set(changed)]
+    print(f"stale artifacts: {', '.join(stale) or '-'}")
+    if stale and args.precompute:
+        from scripts.precompute import run_stale
+
+        run_stale(stale, args.workers)
+    return changed
+
+
+if __name__ == '__main__':
+    main()
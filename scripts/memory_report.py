@@ -0,0 +1,53 @@
+import argparse
+import json
+
+import pandas as pd
+
+from dd_core import datasets
+
+# Memory footprint of every dataset, as a plain pd.read_csv of the export with
+# default dtypes and in the typed form the pages share (see dd_core/datasets.py):
+#   python -m scripts.memory_report [DATASET ...] [--json]
+
+
+def footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def report(names=None):
+    rows = []
+    for name in names or list(datasets.DATASETS):
+        raw = pd.read_csv(datasets.source_path(name), encoding='utf-8-sig')
+        typed = datasets.load(name)
+        rows.append({
+            'dataset': name,
+            'rows': len(typed),
+            'default_bytes': footprint(raw),
+            'typed_bytes': footprint(typed),
+        })
+    table = pd.DataFrame(rows)
+    table['ratio'] = (table['typed_bytes'] / table['default_bytes']).round(3)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Memory footprint of the datasets before and after typing.')
+    parser.add_argument('datasets', nargs='*', help='datasets to report (default: all)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+    unknown = set(args.datasets) - set(datasets.DATASETS)
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(sorted(unknown))}")
+
+    table = report(args.datasets)
+    if args.json:
+        print(json.dumps(table.to_dict(orient='records'), indent=2))
+        return table
+    totals = table[['default_bytes', 'typed_bytes']].sum()
+    print(table.to_string(index=False))
+    print(f"total: {totals['default_bytes'] / 1024:,.1f} KiB -> {totals['typed_bytes'] / 1024:,.1f} KiB")
+    return table
+
+
+if __name__ == '__main__':
+    main()
@@ -1,65 +1,205 @@
-from pymongo import MongoClient
+import argparse
 import csv
+import hashlib
+import os
+import time
+from datetime import datetime
 
-# Connect to the MongoDB instance
-connection_string = "mongodb://127.0.0.1:27017/?directConnection=true"
-client = MongoClient(connection_string)
-
-# Create or access the database named 'Data-Dynamos-DB'
-db_name = 'Data-Dynamos-DB'
-db = client[db_name]
-
-# Create or access the collection for income levels by education
-collection_name_1 = 'income_levels_by_education_collection'
-income_levels_by_education_collection = db[collection_name_1]
-
-# Create or access the collection for employment forecast
-collection_name_2 = 'employment_forecast_collection'
-employment_forecast_collection = db[collection_name_2]
-
-# Create or access the collection for geographic education distribution
-collection_name_3 = 'geographic_education_distribution_collection'
-geographic_education_distribution_collection = db[collection_name_3]
-
-# Import data from the 'dd_m1_income_levels_by_education.csv' file into the income_levels_by_education_collection
-with open('content/dd_m1_income_levels_by_education.csv', 'r') as file:
-    csv_data = csv.reader(file)
-    next(csv_data)  # Skip the header row
-    for row in csv_data:
-        data = {
-            'year': row[0],
+from pymongo import ASCENDING, MongoClient, UpdateOne
+
+# Usage (from the repository root):
+#   python scripts/mongo_script.py [--uri URI] [--db NAME] [--chunk-size N] [--collections NAME ...]
+#
+# Every document is upserted on its natural key, so rerunning the loader updates
+# the existing documents instead of duplicating them.
+
+DEFAULT_URI = "mongodb://127.0.0.1:27017/?directConnection=true"
+DEFAULT_DB_NAME = 'Data-Dynamos-DB'
+DEFAULT_CHUNK_SIZE = 1000
+# One stamp per loaded collection with the hash of its source file; the pages
+# use it with the document count as a cheap version marker (dd_core/mongo.py)
+VERSIONS_COLLECTION = 'dd_versions'
+
+
+def to_number(value):
+    value = value.strip().rstrip('%')
+    return float(value) if value else None
+
+
+def read_csv_rows(path):
+    # utf-8-sig drops the byte order mark the exports start with
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        csv_data = csv.reader(file)
+        header = next(csv_data)  # Skip the header row
+        for row in csv_data:
+            yield header, row
+
+
+# Documents for the income_levels_by_education_collection
+def income_documents(path):
+    for _, row in read_csv_rows(path):
+        yield {
+            'year': int(row[0]),
             'region': row[1],
             'type of work': row[2],
+            'wages': row[3],
             'level of education': row[4],
             'age group': row[5],
-            'both sex combined' : row[6],
-            'male' : row[7],
-            'female' : row[8],
+            'both sex combined': to_number(row[6]),
+            'male': to_number(row[7]),
+            'female': to_number(row[8]),
         }
-        income_levels_by_education_collection.insert_one(data)
-
-# Retrieve and display all data from the income_levels_by_education_collection
-print("Data from income_levels_by_education collection:\n")
-for data in income_levels_by_education_collection.find():
-    print(data)
-
-# Import data from the 'dd_m3_geographic_education_distribution.csv' file into the geographic_education_distribution_collection
-with open('content/dd_m3_geographic_education_distribution.csv', 'r') as file:
-    csv_data = csv.reader(file)
-    next(csv_data)  # Skip the header row
-    for row in csv_data:
-        data = {
-            'region': row[0],
-            'education_level': row[1],
-            'enrollment': row[2],
-            'graduation': row[3]
+
+
+# Documents for the geographic_education_distribution_collection, one per region, level and year
+def geographic_documents(path):
+    for header, row in read_csv_rows(path):
+        for year, value in zip(header[2:], row[2:]):
+            yield {
+                'region': row[0],
+                'education_level': row[1],
+                'year': int(year),
+                'percentage': to_number(value),
+            }
+
+
+# The export labels October 2021 as '10-01-2020' (data row 201); keyed by date it
+# would overwrite October 2020. Same correction as in dd_core/datasets.py.
+EMPLOYMENT_ROW_CORRECTIONS = {201: '10-01-2021'}
+
+
+# Documents for the employment_forecast_collection (monthly Ontario employment)
+def employment_documents(path):
+    for position, (_, row) in enumerate(read_csv_rows(path)):
+        date = EMPLOYMENT_ROW_CORRECTIONS.get(position, row[0])
+        yield {
+            'date': datetime.strptime(date, '%m-%d-%Y'),
+            'employment': to_number(row[1]),
         }
-        geographic_education_distribution_collection.insert_one(data)
 
-# Retrieve and display all data from the geographic_education_distribution_collection
-print("Data from geographic_education_distribution collection:\n")
-for data in geographic_education_distribution_collection.find():
-    print(data)
 
-# Close the MongoDB connection
-client.close()
\ No newline at end of file
+# Source file, document builder, natural key and the secondary indexes the dashboards query by
+COLLECTIONS = {
+    'income_levels_by_education_collection': {
+        'file': 'content/dd_m1_income_levels_by_education.csv',
+        'documents': income_documents,
+        'key': ['year', 'region', 'type of work', 'wages', 'level of education', 'age group'],
+        'indexes': [
+            ['level of education'],
+            ['level of education', 'wages'],
+            ['age group'],
+            ['type of work'],
+        ],
+    },
+    'geographic_education_distribution_collection': {
+        'file': 'content/dd_m3_geographic_education_distribution.csv',
+        'documents': geographic_documents,
+        'key': ['region', 'education_level', 'year'],
+        'indexes': [
+            ['education_level', 'year'],
+            ['year'],
+        ],
+    },
+    'employment_forecast_collection': {
+        'file': 'content/labour-market-report-1.csv',
+        'documents': employment_documents,
+        'key': ['date'],
+        'indexes': [],
+    },
+}
+
+
+def chunked(documents, chunk_size):
+    chunk = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ensure_indexes(collection, key, indexes):
+    # The natural key doubles as the unique index the upserts match on
+    collection.create_index([(field, ASCENDING) for field in key], unique=True)
+    for fields in indexes:
+        collection.create_index([(field, ASCENDING) for field in fields])
+
+
+def load_collection(collection, documents, key, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Upsert the documents in unordered bulk writes of `chunk_size` operations
+    rows = upserted = modified = 0
+    for chunk in chunked(documents, chunk_size):
+        requests = [
+            UpdateOne({field: document[field] for field in key}, {'$set': document}, upsert=True)
+            for document in chunk
+        ]
+        result = collection.bulk_write(requests, ordered=False)
+        rows += len(chunk)
+        upserted += result.upserted_count
+        modified += result.modified_count
+    return {'rows': rows, 'upserted': upserted, 'modified': modified}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run(db, names, chunk_size=DEFAULT_CHUNK_SIZE):
+    report = {}
+    for name in names:
+        spec = COLLECTIONS[name]
+        if not os.path.exists(spec['file']):
+            print(f"{name}: skipped, {spec['file']} not found")
+            continue
+        collection = db[name]
+        ensure_indexes(collection, spec['key'], spec['indexes'])
+
+        start = time.perf_counter()
+        stats = load_collection(collection, spec['documents'](spec['file']), spec['key'], chunk_size)
+        elapsed = time.perf_counter() - start
+        db[VERSIONS_COLLECTION].update_one({'_id': name}, {'$set': {'source_sha256': file_sha256(spec['file'])}},
+                                           upsert=True)
+        stats['seconds'] = elapsed
+        stats['rows_per_second'] = stats['rows'] / elapsed if elapsed else float('inf')
+        report[name] = stats
+        print(f"{name}: {stats['rows']} rows ({stats['upserted']} inserted, {stats['modified']} updated) "
+              f"in {elapsed:.2f}s, {stats['rows_per_second']:,.0f} rows/sec")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load the content/ datasets into MongoDB.')
+    parser.add_argument('--uri', default=DEFAULT_URI, help='MongoDB connection string')
+    parser.add_argument('--db', default=DEFAULT_DB_NAME, help='database name')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='number of upserts sent per bulk write')
+    parser.add_argument('--collections', nargs='+', choices=list(COLLECTIONS), default=list(COLLECTIONS),
+                        help='collections to load (default: all)')
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    return args
+
+
+# `client` lets tests pass a mongomock.MongoClient() instead of connecting to a server
+def main(argv=None, client=None):
+    args = parse_args(argv)
+    owns_client = client is None
+    if owns_client:
+        client = MongoClient(args.uri)
+    try:
+        return run(client[args.db], args.collections, args.chunk_size)
+    finally:
+        # Close the MongoDB connection
+        if owns_client:
+            client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dd_core import precompute
+
+# Background worker that keeps the precomputed artifacts (forecasts, seasonal
+# decomposition, clustering, income pivots; see dd_core/precompute.py) in step
+# with the data:
+#   python -m scripts.precompute [--once] [--interval 30] [--workers N] [--jobs ...]
+#
+# Every `interval` seconds it checks the inputs of each job (the CSVs under
+# content/, or the MongoDB collections with DD_DATA_SOURCE=mongo), recomputes the
+# stale jobs in a process pool and publishes the new versions atomically. The
+# pages only read the published artifacts, so their latency no longer depends on
+# model fitting.
+
+
+def report(job, run, published):
+    try:
+        job, version, seconds = run()
+    except Exception as error:
+        print(f'{job}: failed: {error!r}', flush=True)
+        return
+    print(f'{job}: published {version} ({seconds:.2f}s)', flush=True)
+    published.append(job)
+
+
+def run_stale(jobs, workers):
+    precompute.refresh_inputs()
+    stale = precompute.stale_jobs(jobs)
+    if not stale:
+        return []
+
+    # Jobs with a process pool of their own run one after another with all the workers;
+    # the others share one pool, a process each, so pools never nest (workers squared processes)
+    parallel = [job for job in stale if precompute.JOBS[job].get('parallel')]
+    serial = [job for job in stale if job not in parallel]
+    published = []
+    if serial:
+        # spawn, so no MongoDB client or thread state is inherited from this process
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(serial)), mp_context=context) as pool:
+            futures = {pool.submit(precompute.run_job, job, 1): job for job in serial}
+            for future in as_completed(futures):
+                report(futures[future], future.result, published)
+    for job in parallel:
+        report(job, lambda: precompute.run_job(job, workers), published)
+    return published
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Recompute the dashboard artifacts when their data changes.')
+    parser.add_argument('--jobs', nargs='+', choices=list(precompute.JOBS), default=list(precompute.JOBS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='size of the process pool')
+    parser.add_argument('--interval', type=float, default=30, help='seconds between checks of the inputs')
+    parser.add_argument('--once', action='store_true', help='bring the artifacts up to date and exit')
+    args = parser.parse_args(argv)
+
+    while True:
+        start = time.perf_counter()
+        published = run_stale(args.jobs, args.workers)
+        if published:
+            print(f'{len(published)} artifacts published in {time.perf_counter() - start:.2f}s', flush=True)
+        if args.once:
+            return published
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from dd_core.paths import ROOT_DIR
+
+# Startup profile of the dashboard:
+#   python -m scripts.profile_startup [--json] [--modules m1 m2 ...] [--skip-dependencies]
+#
+# Every measurement runs in a fresh interpreter, so the numbers are cold-start
+# costs as an autoscaled container would see them:
+#  - dependencies: cumulative `python -X importtime` time of each heavy import
+#  - modules: time to import each dashboard module, time of its first render
+#    (headless, via Streamlit's AppTest) and the heavy dependencies that were
+#    still not imported after that first render
+
+DEPENDENCIES = [
+    'streamlit',
+    'pandas',
+    'pyarrow.parquet',
+    'matplotlib.pyplot',
+    'seaborn',
+    'plotly.express',
+    'statsmodels.api',
+    'sklearn.cluster',
+    'folium',
+    'pymongo',
+]
+
+MODULES = {
+    'm1': 'dd_m1_income_levels_by_education',
+    'm2': 'dd_m2_employment_trends_and_insights',
+    'm3': 'dd_m3_geographic_education_distribution',
+}
+
+# Runs inside the fresh interpreter; prints one JSON line with the timings
+_MODULE_PROBE = """
+import importlib, json, sys, time
+deps = {deps!r}
+start = time.perf_counter()
+importlib.import_module({module!r})
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout={timeout}).run()
+rendered = time.perf_counter()
+print(json.dumps({{
+    'import_seconds': imported - start,
+    'first_render_seconds': rendered - imported,
+    'exceptions': [str(e.value) for e in at.exception],
+    'deferred': [dep for dep in deps if dep not in sys.modules],
+}}))
+"""
+
+
+def _environment():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT_DIR, env.get('PYTHONPATH')]))
+    return env
+
+
+def dependency_import_seconds(dependency):
+    # -X importtime writes one line per module to stderr; the last one is the
+    # requested module itself with its cumulative time in microseconds
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {dependency}'],
+                               capture_output=True, text=True, cwd=ROOT_DIR, env=_environment())
+    if completed.returncode != 0:
+        return None
+    last_line = completed.stderr.strip().splitlines()[-1]
+    return int(last_line.split('|')[1]) / 1e6
+
+
+def profile_module(module, timeout):
+    code = _MODULE_PROBE.format(deps=DEPENDENCIES, module=module, path=f'{module}.py', timeout=timeout)
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                               cwd=ROOT_DIR, env=_environment())
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold import and first-render times.')
+    parser.add_argument('--modules', nargs='+', choices=list(MODULES), default=list(MODULES))
+    parser.add_argument('--skip-dependencies', action='store_true')
+    parser.add_argument('--timeout', type=float, default=300, help='first-render timeout in seconds')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = {'dependencies': {}, 'modules': {}}
+    if not args.skip_dependencies:
+        for dependency in DEPENDENCIES:
+            report['dependencies'][dependency] = dependency_import_seconds(dependency)
+    for name in args.modules:
+        report['modules'][name] = profile_module(MODULES[name], args.timeout)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+
+    for dependency, seconds in report['dependencies'].items():
+        print(f"{dependency:<20} {'failed' if seconds is None else f'{seconds:.3f}s'}")
+    for name, result in report['modules'].items():
+        if 'error' in result:
+            print(f"{name}: failed {result['error']}")
+            continue
+        print(f"{name}: import {result['import_seconds']:.3f}s, first render {result['first_render_seconds']:.3f}s, "
+              f"not imported: {', '.join(result['deferred']) or '-'}")
+        for exception in result['exceptions']:
+            print(f'    exception: {exception}')
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Import the dd_core package and the pages from the repository root, and keep
+# everything the tests derive (Parquet tables, models, ...) out of the real .cache
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault('DD_CACHE_DIR', tempfile.mkdtemp(prefix='dd_cache_'))
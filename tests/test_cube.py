@@ -0,0 +1,45 @@
+import pandas as pd
+
+from dd_core import cube
+import dd_m1_income_levels_by_education as m1
+
+
+def typed_rows():
+    # Categoricals in order of appearance, as dd_core.datasets types them, with
+    # the labels appearing in anything but sorted order
+    rows = pd.DataFrame({
+        'Education level': ['Total, all education levels', '0 - 8 years', 'Some high school'] * 4,
+        'Wages': ['Total employees, all wages'] * 6 + ['Average hourly wage rate'] * 6,
+        'Age group': ['15 years and over'] * 12,
+        'Type of work': ['Both full- and part-time'] * 6 + ['Full-time'] * 6,
+        'Male': [float(value) for value in range(12)],
+        'Female': [float(value) for value in range(12, 24)],
+        'Both Sexes': [float(value) for value in range(100, 112)],
+    })
+    for column in cube.DIMENSIONS:
+        rows[column] = rows[column].astype(pd.CategoricalDtype(rows[column].unique()))
+    return rows
+
+
+def test_pivot_sorted_like_pivot_table():
+    rows = typed_rows()
+    table = cube.pivot(cube.build_cube(rows), 'Both Sexes')
+    expected = pd.pivot_table(rows.astype({column: str for column in cube.DIMENSIONS}), values=['Both Sexes'],
+                              index=['Education level'], columns=['Wages'], aggfunc={'Both Sexes': ['max', 'mean']})
+    assert list(table.index) == list(expected.index) == ['0 - 8 years', 'Some high school',
+                                                         'Total, all education levels']
+    assert list(table.columns) == list(expected.columns)
+    assert table.columns[0] == ('Both Sexes', 'max', 'Average hourly wage rate')
+
+
+def test_summarize_sorted_by_name():
+    sums, means = cube.summarize(cube.build_cube(typed_rows()), 'Education level')
+    assert list(sums.index) == list(means.index) == ['0 - 8 years', 'Some high school', 'Total, all education levels']
+    assert list(sums.columns) == cube.MEASURES
+
+
+def test_pivot_barplot_plots_max_average_hourly_wage():
+    table = cube.pivot(cube.build_cube(typed_rows()), 'Both Sexes')
+    fig = m1.pivot_barplot(table)
+    heights = [bar.get_height() for bar in fig.axes[0].patches]
+    assert heights == list(table[('Both Sexes', 'max', 'Average hourly wage rate')])
@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+
+from dd_core import datasets, paths
+
+NAME = 'employment'
+# Months of the fixture CSV copied from the head of the real export
+FIXTURE_ROWS = 30
+
+
+@pytest.fixture
+def content(tmp_path, monkeypatch):
+    # The employment CSV's first months under a temporary content/, and an empty cache
+    monkeypatch.setattr(datasets, 'CONTENT_DIR', str(tmp_path / 'content'))
+    monkeypatch.setattr(paths, 'CACHE_DIR', str(tmp_path / 'cache'))
+    os.makedirs(tmp_path / 'content')
+    with open(os.path.join(paths.CONTENT_DIR, datasets.DATASETS[NAME]['file']), 'rb') as file:
+        lines = [file.readline() for _ in range(FIXTURE_ROWS + 1)]
+    with open(datasets.source_path(NAME), 'wb') as file:
+        file.writelines(lines)
+    return datasets.source_path(NAME)
+
+
+def _append_line(path, line):
+    # Append a line and move the mtime on, as a copy of a newer export would
+    stat = os.stat(path)
+    with open(path, 'ab') as file:
+        file.write(line.encode())
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_ingest_appends_a_new_month(content):
+    assert datasets.ingest(NAME)['action'] == 'rebuilt'
+    assert datasets.ingest(NAME)['action'] == 'unchanged'
+
+    stat = os.stat(content)
+    os.utime(content, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert datasets.ingest(NAME) == {'dataset': NAME, 'action': 'touched', 'path': datasets.table_path(NAME),
+                                     'rows': 0}
+
+    _append_line(content, '07-01-2007,6560.5\n')
+    report = datasets.ingest(NAME)
+    assert report['action'] == 'appended' and report['rows'] == 1
+
+    df = datasets.load(NAME)
+    pd.testing.assert_frame_equal(df, datasets.read_csv(NAME))
+    assert len(df) == FIXTURE_ROWS + 1
+    assert df['Date'].iloc[-1] == pd.Timestamp('2007-07-01')
+    assert df.iloc[-1, 1] == 6560.5
+
+
+def test_ingest_rejects_an_appended_duplicate_month(content):
+    datasets.ingest(NAME)
+    _append_line(content, '06-01-2007,6560.5\n')
+    with pytest.raises(ValueError, match='duplicate 2007-06'):
+        datasets.ingest(NAME)
+
+
+def test_ingest_rebuilds_when_an_earlier_row_changes(content):
+    datasets.ingest(NAME)
+    with open(content) as file:
+        text = file.read()
+    with open(content, 'w') as file:
+        file.write(text.replace('6348.8', '6348.9') + '07-01-2007,6560.5\n')
+
+    report = datasets.ingest(NAME)
+    assert report['action'] == 'rebuilt' and report['rows'] == FIXTURE_ROWS + 1
+    assert datasets.load(NAME).iloc[1, 1] == 6348.9
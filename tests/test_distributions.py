@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from dd_core import distributions
+from dd_core.streaming import Histogram
+
+
+def test_kde_grid_matches_scipy_gaussian_kde():
+    rng = np.random.default_rng(11)
+    centers = np.round(np.concatenate([rng.normal(40, 8, 300), rng.normal(75, 4, 100)]), 1)
+    centers, weights = np.unique(centers, return_counts=True)
+    grid, density = distributions.kde_grid(centers, weights.astype('float64'))
+
+    # Same Scott bandwidth as kde_grid (scipy scales the n - 1 standard deviation)
+    values = np.repeat(centers, weights)
+    bandwidth = np.std(values) * len(values) ** (-1 / 5)
+    reference = stats.gaussian_kde(values, bw_method=bandwidth / np.std(values, ddof=1))(grid)
+
+    assert len(grid) == distributions.GRID_POINTS
+    assert grid[0] == pytest.approx(centers.min() - distributions.CUT * bandwidth)
+    np.testing.assert_allclose(density, reference, atol=5e-3 * reference.max())
+    assert np.trapz(density, grid) == pytest.approx(1, abs=5e-3)
+
+
+def test_kde_grid_without_spread():
+    assert distributions.kde_grid(np.array([3.0]), np.array([10.0])) is None
+
+
+def test_ecdf_grid_is_the_share_below_each_edge():
+    values = np.random.default_rng(5).gamma(2, 10, 2_000)
+    histogram = Histogram()
+    histogram.add(values)
+    edges, proportion = distributions.ecdf_grid(histogram, points=100_000)
+
+    np.testing.assert_allclose(proportion, [(values < edge).mean() for edge in edges], atol=1e-12)
+    thinned_edges, thinned = distributions.ecdf_grid(histogram, points=50)
+    assert len(thinned_edges) <= 50 and thinned[0] == 0 and thinned[-1] == pytest.approx(1)
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from dd_core.downsample import lttb, visible
+
+
+def _reference_lttb(x, y, threshold):
+    # The published algorithm (Steinarsson, 2013), point by point
+    every = (len(x) - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        next_start, next_end = math.floor((i + 1) * every) + 1, min(math.floor((i + 2) * every) + 1, len(x))
+        next_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        next_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = None, -1
+        for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+            area = abs((x[a] - next_x) * (y[j] - y[a]) - (x[a] - x[j]) * (next_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [len(x) - 1]
+
+
+def test_lttb_keeps_endpoints_and_returns_threshold_points():
+    rng = np.random.default_rng(7)
+    x = np.arange(1_003, dtype='float64')
+    y = np.cumsum(rng.normal(size=len(x)))
+    selected = lttb(x, y, 100)
+
+    assert len(selected) == 100
+    assert selected[0] == 0 and selected[-1] == len(x) - 1
+    assert (np.diff(selected) > 0).all()
+    assert list(selected) == _reference_lttb(list(x), list(y), 100)
+
+
+def test_lttb_passes_short_series_through():
+    assert list(lttb([1, 2, 3], [4, 5, 6], 10)) == [0, 1, 2]
+    assert list(lttb(np.arange(10), np.arange(10), 10)) == list(range(10))
+
+
+def test_visible_keeps_both_bounds():
+    df = pd.DataFrame({'month': pd.date_range('2020-01-01', periods=12, freq='MS'), 'y': np.arange(12.0)})
+    df.loc[3, 'y'] = np.nan
+    rows = visible(df, 'month', 'y', pd.Timestamp('2020-02-01'), pd.Timestamp('2020-06-01'))
+
+    assert list(rows['month'].dt.month) == [2, 3, 5, 6]
+    assert len(visible(df, 'month', 'y', threshold=5)) == 5
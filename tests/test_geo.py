@@ -0,0 +1,47 @@
+from dd_core import geo
+
+
+def test_douglas_peucker_keeps_ends_and_corners():
+    line = [(0, 0), (1, 0.01), (2, 0), (2, 2)]
+    assert list(geo.douglas_peucker(line, 0.1)) == [0, 2, 3]
+    assert list(geo.douglas_peucker(line, 0)) == [0, 1, 2, 3]
+
+
+def test_region_map_leaves_cached_layers_untouched():
+    first = geo.region_map_html({'Ontario': 12.3456, 'Quebec': 1.5}, caption='first')
+    second = geo.region_map_html({'Ontario': 65.4321, 'Quebec': 1.5}, caption='second')
+    plain = geo.region_map_html(highlight='Ontario')
+
+    assert '"value": "12.3456"' in first and '"value": "65.4321"' not in first
+    assert '"value": "65.4321"' in second and '"value": "12.3456"' not in second
+    assert '"value":' not in plain
+    for collection in geo.zoom_layers().values():
+        assert all('value' not in feature['properties'] for feature in collection['features'])
+
+
+def test_region_map_credits_the_boundary_data():
+    assert geo.attribution()
+    assert geo.attribution() in geo.region_map_html()
+
+
+def _square(x, y):
+    return [[[x, y], [x + 1.000049, y], [x + 1, y + 1], [x, y + 1], [x, y]]]
+
+
+def test_build_regions_names_merges_and_credits():
+    from scripts import build_regions
+
+    features = [{'type': 'Feature', 'properties': {'name': 'Québec', 'adm0_a3': 'CAN'},
+                 'geometry': {'type': 'Polygon', 'coordinates': _square(-72, 50)}},
+                {'type': 'Feature', 'properties': {'name': 'Quebec', 'adm0_a3': 'USA'},
+                 'geometry': {'type': 'Polygon', 'coordinates': _square(0, 0)}}]
+    for number, region in enumerate(build_regions.REGIONS):
+        features.append({'type': 'Feature', 'properties': {'name': region, 'adm0_a3': 'CAN'},
+                         'geometry': {'type': 'MultiPolygon', 'coordinates': [_square(number, 60)]}})
+    collection = build_regions.convert({'type': 'FeatureCollection', 'features': features}, 'naturalearth')
+
+    assert [feature['properties']['name'] for feature in collection['features']] == build_regions.REGIONS
+    quebec = collection['features'][build_regions.REGIONS.index('Quebec')]['geometry']
+    assert quebec['type'] == 'MultiPolygon' and len(quebec['coordinates']) == 2
+    assert quebec['coordinates'][0][0][1] == [-71.0, 50]
+    assert 'Natural Earth' in collection['properties']['attribution']
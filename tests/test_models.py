@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dd_core import models, paths
+
+ORDER = (1, 1, 1)
+SOURCE = 'test_series'
+
+
+@pytest.fixture
+def fits(tmp_path, monkeypatch):
+    # Empty model caches, and a count of the full ARIMA optimisations
+    from statsmodels.tsa.arima.model import ARIMA
+
+    monkeypatch.setattr(paths, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(models, '_memory', models.LRUCache(maxsize=32))
+    calls = []
+    fit = ARIMA.fit
+
+    def counted(self, *args, **kwargs):
+        calls.append(self.endog.shape[0])
+        return fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(ARIMA, 'fit', counted)
+    return calls
+
+
+def _series(months):
+    rng = np.random.default_rng(7)
+    values = 100 + np.cumsum(rng.normal(0.2, 1.0, 120))
+    return pd.Series(values[:months], index=pd.date_range('2010-01-01', periods=months, freq='MS'), name='value')
+
+
+def _stored(series):
+    path = models._model_file(SOURCE, models.series_fingerprint(series), ORDER)
+    with open(path) as file:
+        return json.load(file)
+
+
+def test_appended_months_reuse_the_parameters_until_refit(fits):
+    first = models.fit_arima(_series(60), ORDER, source=SOURCE)
+    assert fits == [60]
+
+    # Each new month is filtered with the parameters of the last full fit
+    for months in range(61, 61 + models.REFIT_AFTER):
+        results = models.fit_arima(_series(months), ORDER, source=SOURCE)
+        assert fits == [60]
+        pd.testing.assert_series_equal(results.params, first.params)
+        assert results.nobs == months
+        assert _stored(_series(months))['appended'] == months - 60
+
+    # One more and the model is fitted again on the whole series
+    months = 61 + models.REFIT_AFTER
+    models.fit_arima(_series(months), ORDER, source=SOURCE)
+    assert fits == [60, months]
+    assert _stored(_series(months))['appended'] == 0
+
+
+def test_revised_history_is_refitted(fits):
+    models.fit_arima(_series(60), ORDER, source=SOURCE)
+    revised = _series(61)
+    revised.iloc[10] += 5
+    models.fit_arima(revised, ORDER, source=SOURCE)
+    assert fits == [60, 61]
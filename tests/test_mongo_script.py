@@ -0,0 +1,53 @@
+import os
+
+import mongomock
+import pytest
+
+from dd_core.paths import CONTENT_DIR
+from scripts import mongo_script
+
+# Data rows copied from the head of each source file; the full income file takes
+# minutes to upsert under mongomock
+FIXTURE_ROWS = 40
+
+
+@pytest.fixture
+def content(tmp_path, monkeypatch):
+    # The loader reads content/... relative to the working directory
+    os.makedirs(tmp_path / 'content')
+    for spec in mongo_script.COLLECTIONS.values():
+        source = os.path.join(CONTENT_DIR, os.path.basename(spec['file']))
+        with open(source, encoding='utf-8-sig', newline='') as file:
+            lines = [file.readline() for _ in range(FIXTURE_ROWS + 1)]
+        with open(tmp_path / spec['file'], 'w', encoding='utf-8', newline='') as file:
+            file.writelines(lines)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def expected_counts():
+    # Distinct natural keys of the fixture documents
+    return {name: len({tuple(document[field] for field in spec['key'])
+                       for document in spec['documents'](spec['file'])})
+            for name, spec in mongo_script.COLLECTIONS.items()}
+
+
+def test_load_and_reload_is_idempotent(content):
+    client = mongomock.MongoClient()
+    expected = expected_counts()
+    argv = ['--db', 'test', '--chunk-size', '16']
+
+    first = mongo_script.main(argv, client=client)
+    db = client['test']
+    for name, count in expected.items():
+        assert first[name]['upserted'] == count
+        assert db[name].count_documents({}) == count
+        assert db[mongo_script.VERSIONS_COLLECTION].find_one({'_id': name})['source_sha256'] == \
+            mongo_script.file_sha256(mongo_script.COLLECTIONS[name]['file'])
+
+    second = mongo_script.main(argv, client=client)
+    for name, count in expected.items():
+        assert second[name]['rows'] == first[name]['rows']
+        assert second[name]['upserted'] == 0
+        assert second[name]['modified'] == 0
+        assert db[name].count_documents({}) == count
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from dd_core.monthly import MonthlyPanel
+
+
+def _panel():
+    months = pd.period_range('2019-01', '2020-12', freq='M', name='Month')
+    return MonthlyPanel(pd.DataFrame({'a': np.arange(24.0), 'b': np.arange(24.0) * 2}, index=months))
+
+
+def test_range_includes_both_bounds():
+    panel = _panel()
+    rows = panel.range('2019-03', '2019-07')
+
+    assert [str(month) for month in rows.index] == ['2019-03', '2019-04', '2019-05', '2019-06', '2019-07']
+    assert list(panel.range(pd.Timestamp('2020-12-01'), '2020-12', columns=['b'])['b']) == [46.0]
+    assert list(panel.range(pd.Period('2019-02', 'M'), '2019-02').index.astype(str)) == ['2019-02']
+
+
+def test_range_open_and_outside_bounds():
+    panel = _panel()
+
+    assert len(panel.range()) == 24
+    assert str(panel.range(end='2019-02').index[-1]) == '2019-02'
+    assert str(panel.range(start='2020-11').index[0]) == '2020-11'
+    assert len(panel.range('2018-01', '2030-01')) == 24
+    assert panel.range('2021-01', '2021-06').empty
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from dd_core.trends import linear_trends
+
+
+def _long_frame():
+    rng = np.random.default_rng(3)
+    frames = []
+    for group, (slope, months) in {'b': (2.0, 40), 'a': (-0.5, 25), 'c': (0.1, 3)}.items():
+        y = 10 + slope * np.arange(months) + rng.normal(0, 1, months)
+        frames.append(pd.DataFrame({'group': group, 'month': pd.date_range('2020-01-01', periods=months, freq='MS'),
+                                    'y': y}))
+    df = pd.concat(frames, ignore_index=True)
+    df.loc[[5, 50], 'y'] = np.nan
+    return df
+
+
+def test_linear_trends_match_polyfit_per_group():
+    df = _long_frame()
+    trends = linear_trends(df, 'group', 'y')
+
+    assert list(trends.index) == ['a', 'b', 'c']
+    for group, rows in df.dropna(subset=['y']).groupby('group'):
+        x = np.arange(len(rows))
+        slope, intercept = np.polyfit(x, rows['y'], 1)
+        fitted = intercept + slope * x
+        r2 = 1 - ((rows['y'] - fitted) ** 2).sum() / ((rows['y'] - rows['y'].mean()) ** 2).sum()
+        stderr = np.sqrt(((rows['y'] - fitted) ** 2).sum() / (len(rows) - 2) / ((x - x.mean()) ** 2).sum())
+        row = trends.loc[group]
+        np.testing.assert_allclose([row['slope'], row['intercept'], row['r2'], row['stderr']],
+                                   [slope, intercept, r2, stderr], rtol=1e-9, atol=1e-12)
+        assert row['n'] == len(rows) and row['max'] == rows['y'].max()
+
+
+def test_linear_trends_on_dates_use_days():
+    df = _long_frame()
+    trends = linear_trends(df, 'group', 'y', x='month')
+    rows = df[(df['group'] == 'b') & df['y'].notna()]
+    days = rows['month'].to_numpy('datetime64[D]').astype('float64')
+    slope, intercept = np.polyfit(days, rows['y'], 1)
+    np.testing.assert_allclose([trends.loc['b', 'slope'], trends.loc['b', 'intercept']], [slope, intercept],
+                               rtol=1e-6)